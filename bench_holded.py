@@ -0,0 +1,143 @@
+"""Throughput benchmark of the Holded fetchers against holded_mock.
+
+    python bench_holded.py --documents 20000 --latency 0.03 --error-rate 0.02
+
+Each scenario reports documents/second, p50/p99 latency of each page or document call
+(retries included, timed until the body is parsed) and the peak Python memory traced
+while it ran.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from holded import WAYBILL_FIELDS, DocumentCache, HoldedClient, get_details
+from holded_mock import MockHolded
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+class TimedClient(HoldedClient):
+    """HoldedClient recording the wall time of every page and document call, retries included.
+
+    Calls are timed rather than requests, since a streamed listing request returns once the
+    headers arrive and its body is read afterwards.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    def _timed(self, call, *args):
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+
+    def list_page(self, doc_type="waybill", page=1, params=None, fields=None):
+        return self._timed(super().list_page, doc_type, page, params, fields)
+
+    def get_document(self, doc_type, document_id):
+        return self._timed(super().get_document, doc_type, document_id)
+
+
+def run(name, scenario, mock, workers, trace_memory=True):
+    """Time scenario(client) -> documents handled, then rerun it under tracemalloc."""
+    with TimedClient("benchmark", base_url=mock.url, max_workers=workers, backoff=0.05) as client:
+        started = time.perf_counter()
+        documents = scenario(client)
+        elapsed = time.perf_counter() - started
+        latencies = sorted(client.latencies)
+    peak = float("nan")
+    if trace_memory:
+        with HoldedClient("benchmark", base_url=mock.url, max_workers=workers, backoff=0.05) as client:
+            tracemalloc.start()
+            scenario(client)
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+    return {
+        "scenario": name,
+        "workers": workers,
+        "documents": documents,
+        "seconds": elapsed,
+        "docs/s": documents / elapsed if elapsed else float("nan"),
+        "calls": len(latencies),
+        "p50 ms": percentile(latencies, 50) * 1000,
+        "p99 ms": percentile(latencies, 99) * 1000,
+        "peak MiB": peak,
+    }
+
+
+def scenarios(sample):
+    def full_listing(client):
+        return len(client.list_documents("waybill"))
+
+    def projected_listing(client):
+        return sum(len(page) for page in client.iter_pages("waybill", fields=WAYBILL_FIELDS))
+
+    def cache_sync(client):
+        with tempfile.TemporaryDirectory() as tmp:
+            return DocumentCache(os.path.join(tmp, "bench.sqlite"), fields=WAYBILL_FIELDS).sync(client, force=True)
+
+    def details(client):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.sqlite")
+            listing = DocumentCache(path, fields=WAYBILL_FIELDS)
+            listing.store(sample)
+            return len(get_details(client, [d["docNumber"] for d in sample], listing,
+                                   DocumentCache(path, name="waybill_detail")).documents)
+
+    return {
+        "listing (full)": full_listing,
+        "listing (projected)": projected_listing,
+        "cache sync": cache_sync,
+        f"details x{len(sample)}": details,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per mock response")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--details", type=int, default=200, help="documents fetched one by one")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    with MockHolded(args.documents, args.page_size, args.latency, args.error_rate, args.rate_limit) as mock:
+        sample = mock.documents[:args.details]
+        results = [
+            run(name, scenario, mock, workers, not args.no_memory)
+            for name, scenario in scenarios(sample).items()
+            for workers in args.workers
+        ]
+        server_stats = dict(mock.stats)
+
+    columns = list(results[0])
+    widths = [max(len(str(row[column])) for row in results) if column == "scenario" else 10
+              for column in columns]
+
+    def line(values):
+        cells = [(f"{value:.2f}" if isinstance(value, float) else str(value)) for value in values]
+        return "  ".join([cells[0].ljust(widths[0])] + [c.rjust(w) for c, w in zip(cells[1:], widths[1:])])
+
+    print(line(columns))
+    for row in results:
+        print(line(row.values()))
+    print(f"mock server: {server_stats}")
+
+
+if __name__ == "__main__":
+    main()
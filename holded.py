@@ -0,0 +1,380 @@
+import asyncio
+import codecs
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+BASE_URL = "https://api.holded.com/api/invoicing/v1"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Fields needed to reconcile waybills with the KN spend report
+WAYBILL_FIELDS = ("id", "docNumber", "date", "contact", "contactName", "products")
+
+
+# ---------- STREAMING JSON ----------
+_SEPARATORS = re.compile(r"[\s,]*")
+_DECODER = json.JSONDecoder()
+
+
+def iter_json_array(chunks):
+    """Decode a top-level JSON array from byte chunks, yielding one element at a time.
+
+    Only the unparsed tail of the text is buffered, never the whole response.
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, started = "", 0, False
+    for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = _SEPARATORS.match(buffer).end()
+        if not started:
+            if pos == len(buffer):
+                continue
+            if buffer[pos] != "[":
+                raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 20]!r}")
+            started = True
+            pos += 1
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                element, end = _DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            # A valid array always continues after an element; wait for more data if not
+            if end >= len(buffer):
+                break
+            yield element
+            pos = end
+    raise ValueError("JSON array is truncated")
+
+
+def project(documents, fields):
+    return [{field: document.get(field) for field in fields} for document in documents]
+
+
+class HoldedClient:
+    """Holded invoicing API over one pooled session, with retries and bounded concurrency.
+
+    base_url can point at a local stand-in of the API for tests and benchmarks.
+    max_workers bounds the pages fetched at once and max_connections (at least max_workers)
+    the document fetches; the connection pool holds the larger of the two.
+    """
+
+    def __init__(self, api_key, base_url=BASE_URL, max_workers=4, timeout=(5, 30),
+                 retries=5, backoff=0.5, max_requests_per_second=None, max_connections=None):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.max_connections = max(max_workers, max_connections or 0)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"accept": "application/json", "key": api_key})
+        # 429 and 5xx are retried with exponential backoff, honouring Retry-After
+        retry = Retry(
+            total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+            allowed_methods=("GET",), respect_retry_after_header=True, raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._min_interval = 1 / max_requests_per_second if max_requests_per_second else 0
+        self._next_request = 0.0
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _throttle(self):
+        # Space request starts so the client stays under the account's rate limit
+        if not self._min_interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_request - now
+            self._next_request = max(now, self._next_request) + self._min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def request(self, path, params=None, stream=False):
+        self._throttle()
+        response = self.session.get(
+            f"{self.base_url}/{path.lstrip('/')}", params=params, timeout=self.timeout, stream=stream
+        )
+        response.raise_for_status()
+        return response
+
+    def get(self, path, params=None):
+        return self.request(path, params).json()
+
+    def get_document(self, doc_type, document_id):
+        return self.get(f"documents/{doc_type}/{document_id}")
+
+    def list_page(self, doc_type="waybill", page=1, params=None, fields=None):
+        """One page of a document listing.
+
+        With fields, the response is stream-decoded and only those fields are kept,
+        so the raw body and the full object tree are never held at once.
+        """
+        params = {**(params or {}), "page": page}
+        if fields is None:
+            return self.get(f"documents/{doc_type}", params)
+        with self.request(f"documents/{doc_type}", params, stream=True) as response:
+            return project(iter_json_array(response.iter_content(chunk_size=1 << 16)), fields)
+
+    def iter_pages(self, doc_type="waybill", params=None, fields=None):
+        """Yield the pages of a document listing in order, fetching up to max_workers at once.
+
+        The listing ends at the first empty page, at a page shorter than the first one,
+        or when a page repeats the previous one (an endpoint that ignores "page").
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+        next_page = 1
+        page_size = None
+        previous = None
+        try:
+            while True:
+                while len(pending) < self.max_workers:
+                    pending[next_page] = pool.submit(self.list_page, doc_type, next_page, params, fields)
+                    next_page += 1
+                page = min(pending)
+                documents = pending.pop(page).result()
+                if not documents or documents == previous:
+                    break
+                yield documents
+                page_size = page_size or len(documents)
+                if len(documents) < page_size:
+                    break
+                previous = documents
+        finally:
+            # Also reached when the caller stops iterating early: drop the queued pages and
+            # leave the ones in flight to finish without waiting for them
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def list_documents(self, doc_type="waybill", params=None, fields=None):
+        return [document for page in self.iter_pages(doc_type, params, fields) for document in page]
+
+    def iter_document_frames(self, doc_type="waybill", params=None, fields=WAYBILL_FIELDS):
+        """The listing as one DataFrame per page, holding only the given fields."""
+        for page in self.iter_pages(doc_type, params, fields):
+            yield pd.DataFrame(page, columns=list(fields))
+
+
+# ---------- LOCAL DOCUMENT CACHE ----------
+CACHE_PATH = "holded_cache.sqlite"
+DEFAULT_TTL = 15 * 60
+# Incremental syncs re-request this far behind the high-water mark, for back-dated documents
+DEFAULT_LOOKBACK = 7 * 24 * 3600
+# A sync this long after the last full one re-reads the whole listing, picking up edits and
+# deletions of older documents
+DEFAULT_FULL_SYNC_EVERY = 24 * 3600
+
+
+def _doc_number(document):
+    # Stored normalized so lookups by ABO are exact
+    number = document.get("docNumber")
+    return str(number).strip().upper() if number is not None else None
+
+
+class DocumentCache:
+    """On-disk copy of Holded documents of one type, kept current by incremental syncs.
+
+    The high-water mark is the latest document date seen; a sync asks Holded for documents
+    from lookback seconds before it on, and none at all while the last sync is younger than
+    ttl. Every full_sync_every seconds the whole listing is re-read and documents Holded no
+    longer returns are dropped.
+    """
+
+    def __init__(self, path=CACHE_PATH, doc_type="waybill", fields=None, name=None):
+        self.path = path
+        self.doc_type = doc_type
+        # Partition of the cache file; lets listings and full details of one type coexist
+        self.name = name or doc_type
+        # Only these fields of each document are downloaded and kept (all if None)
+        self.fields = fields
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " doc_type TEXT, id TEXT, date INTEGER, doc_number TEXT, body TEXT,"
+                " PRIMARY KEY (doc_type, id))"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                " doc_type TEXT PRIMARY KEY, high_water INTEGER, synced_at REAL, full_synced_at REAL)"
+            )
+            # Caches written before full syncs existed lack the column
+            columns = {row[1] for row in db.execute("PRAGMA table_info(sync_state)")}
+            if "full_synced_at" not in columns:
+                db.execute("ALTER TABLE sync_state ADD COLUMN full_synced_at REAL")
+            db.execute("CREATE INDEX IF NOT EXISTS documents_number ON documents (doc_type, doc_number)")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def state(self):
+        """(high-water document date, time of last sync, time of last full sync),
+        all None before the first sync."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT high_water, synced_at, full_synced_at FROM sync_state WHERE doc_type = ?",
+                (self.name,),
+            ).fetchone()
+        return row or (None, None, None)
+
+    def store(self, documents):
+        rows = [
+            (self.name, str(d["id"]), int(d.get("date") or 0), _doc_number(d), json.dumps(d))
+            for d in documents
+        ]
+        with self._connect() as db:
+            db.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def sync(self, client, ttl=DEFAULT_TTL, force=False, lookback=DEFAULT_LOOKBACK,
+             full_sync_every=DEFAULT_FULL_SYNC_EVERY, full=False):
+        """Fetch documents from the look-back window on, or all of them when a full sync
+        is due (or full is set). Returns how many were stored."""
+        high_water, synced_at, full_synced_at = self.state()
+        started = time.time()
+        if not (force or full) and synced_at is not None and started - synced_at < ttl:
+            return 0
+        full = full or high_water is None or full_synced_at is None or started - full_synced_at >= full_sync_every
+        params = None if full else {"starttmp": max(0, high_water - lookback)}
+        stored = 0
+        seen = []
+        for page in client.iter_pages(self.doc_type, params, self.fields):
+            stored += self.store(page)
+            seen.extend((str(d["id"]),) for d in page)
+        with self._connect() as db:
+            if full:
+                # Whatever the full listing no longer returns was deleted in Holded
+                db.execute("CREATE TEMP TABLE seen (id TEXT PRIMARY KEY)")
+                db.executemany("INSERT OR IGNORE INTO seen VALUES (?)", seen)
+                db.execute(
+                    "DELETE FROM documents WHERE doc_type = ? AND id NOT IN (SELECT id FROM seen)",
+                    (self.name,),
+                )
+                full_synced_at = started
+            latest = db.execute(
+                "SELECT MAX(date) FROM documents WHERE doc_type = ?", (self.name,)
+            ).fetchone()[0]
+            db.execute(
+                "INSERT OR REPLACE INTO sync_state (doc_type, high_water, synced_at, full_synced_at)"
+                " VALUES (?, ?, ?, ?)",
+                (self.name, latest, started, full_synced_at),
+            )
+        return stored
+
+    def documents(self):
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT body FROM documents WHERE doc_type = ? ORDER BY date", (self.name,)
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def get(self, doc_numbers, batch_size=500):
+        """Cached documents by docNumber (case-insensitive); numbers not cached are left out."""
+        doc_numbers = list(dict.fromkeys(str(n).strip().upper() for n in doc_numbers))
+        found = {}
+        with self._connect() as db:
+            for i in range(0, len(doc_numbers), batch_size):
+                batch = doc_numbers[i:i + batch_size]
+                rows = db.execute(
+                    "SELECT doc_number, body FROM documents WHERE doc_type = ? AND doc_number IN "
+                    f"({', '.join('?' * len(batch))}) ORDER BY date",
+                    (self.name, *batch),
+                ).fetchall()
+                found.update((doc_number, json.loads(body)) for doc_number, body in rows)
+        return found
+
+
+# ---------- DOCUMENT DETAILS ----------
+# documents by normalized docNumber, and the requested docNumbers Holded has no document for
+DetailLookup = namedtuple("DetailLookup", ["documents", "missing"])
+
+
+async def fetch_documents(client, doc_type, document_ids, concurrency=None):
+    """GET each document by id with at most concurrency requests in flight.
+
+    Retries happen in the client. Returns (documents fetched, {id: exception} of the ones
+    that still failed), so the successes are not lost when some requests fail.
+    """
+    # More requests in flight than pooled connections would open and discard extra ones
+    semaphore = asyncio.Semaphore(min(concurrency or client.max_connections, client.max_connections))
+
+    async def fetch(document_id):
+        async with semaphore:
+            return await asyncio.to_thread(client.get_document, doc_type, document_id)
+
+    results = await asyncio.gather(*map(fetch, document_ids), return_exceptions=True)
+    documents = [result for result in results if not isinstance(result, BaseException)]
+    errors = {document_id: result for document_id, result in zip(document_ids, results)
+              if isinstance(result, BaseException)}
+    return documents, errors
+
+
+def _not_found(error):
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code == 404
+
+
+def get_details(client, doc_numbers, listing, details, concurrency=None):
+    """Full documents for the given docNumbers (e.g. ABOs), as a DetailLookup.
+
+    Duplicates are dropped, documents already in the details cache are served from it,
+    and the rest are located through the listing cache and fetched concurrently.
+    docNumbers the listing does not know, or that Holded answers 404 for (deleted since
+    the last sync), are reported in missing. If any other fetch fails, the documents that
+    did arrive are cached and the first such error is raised.
+    """
+    wanted = list(dict.fromkeys(str(n).strip().upper() for n in doc_numbers))
+    found = details.get(wanted)
+    listed = listing.get(n for n in wanted if n not in found)
+    if listed:
+        ids = [document["id"] for document in listed.values()]
+        fetched, errors = asyncio.run(fetch_documents(client, listing.doc_type, ids, concurrency))
+        details.store(fetched)
+        failures = [error for error in errors.values() if not _not_found(error)]
+        if failures:
+            raise failures[0]
+        found.update((_doc_number(document), document) for document in fetched)
+    return DetailLookup(found, [n for n in wanted if n not in found])
+
+
+def waybill_summary(document):
+    """Contact, items and delivery address of a full waybill, as display strings."""
+    items = ", ".join(
+        f"{float(product.get('units') or 0):g} × {product.get('name', '')}".strip()
+        for product in document.get("products") or []
+    )
+    shipping = document.get("shippingData") or {}
+    address = ", ".join(
+        str(shipping[part]) for part in ("address", "postalCode", "city", "country") if shipping.get(part)
+    )
+    return {
+        "Holded Contact": document.get("contactName") or "",
+        "Items": items,
+        "Delivery Address": address,
+    }
@@ -0,0 +1,191 @@
+"""Local stand-in for the Holded documents API, for offline tests and benchmarks.
+
+    python holded_mock.py --documents 20000 --latency 0.05 --error-rate 0.02 --rate-limit 50
+
+then point HoldedClient at it with base_url="http://127.0.0.1:8000".
+"""
+import argparse
+import bisect
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+PAGE_SIZE = 500
+START_DATE = 1_700_000_000
+
+
+def synthetic_waybills(count, seed=0, start=START_DATE):
+    """Waybills shaped like Holded's, one hour apart, with ABO-style docNumbers."""
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        products = [
+            {"name": f"Product {rng.randrange(200)}", "sku": f"SKU{rng.randrange(10_000):05d}",
+             "units": rng.randint(1, 40), "price": round(rng.uniform(5, 500), 2)}
+            for _ in range(rng.randint(1, 6))
+        ]
+        documents.append({
+            "id": f"{i:024x}",
+            "contact": f"{rng.randrange(500):024x}",
+            "contactName": f"Customer {rng.randrange(500)}",
+            "docNumber": f"A{250000 + i}",
+            "date": start + i * 3600,
+            "notes": "",
+            "products": products,
+            "shippingData": {"address": f"Calle {rng.randrange(1, 200)}", "city": "Madrid",
+                             "postalCode": f"{rng.randrange(1000, 52999):05d}", "country": "ES"},
+            "total": round(sum(p["units"] * p["price"] for p in products), 2),
+        })
+    return documents
+
+
+class MockHolded:
+    """Threaded HTTP server for GET /documents/{type} (paginated) and /documents/{type}/{id}.
+
+    latency is the seconds added to every response (a number or a (low, high) range),
+    error_rate the fraction of requests answered with a 5xx, and rate_limit the requests
+    per second accepted before answering 429 with Retry-After.
+    """
+
+    def __init__(self, documents=10_000, page_size=PAGE_SIZE, latency=0.0, error_rate=0.0,
+                 rate_limit=None, doc_type="waybill", host="127.0.0.1", port=0, seed=0):
+        if isinstance(documents, int):
+            documents = synthetic_waybills(documents, seed)
+        self.documents = sorted(documents, key=lambda d: d["date"])
+        self.dates = [d["date"] for d in self.documents]
+        self.by_id = {d["id"]: d for d in self.documents}
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.doc_type = doc_type
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0
+        self._refilled = time.monotonic()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _admit(self):
+        """None if the request is served, else the error status to answer with."""
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.rate_limit:
+                # Token bucket holding at most one second of requests
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    self.stats["throttled"] += 1
+                    return 429
+                self._tokens -= 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503
+            delay = self.latency
+            if isinstance(delay, (tuple, list)):
+                delay = self._random.uniform(*delay)
+        time.sleep(delay)
+        return None
+
+    def listing(self, query):
+        page = int(query.get("page", ["1"])[0])
+        start = int(query.get("starttmp", ["0"])[0])
+        end = int(query.get("endtmp", [str(2 ** 62)])[0])
+        low = bisect.bisect_left(self.dates, start) + (page - 1) * self.page_size
+        high = min(bisect.bisect_right(self.dates, end), low + self.page_size)
+        return self.documents[low:high]
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body=b"", headers=()):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                if "documents" not in parts or parts[parts.index("documents") + 1:][:1] != [mock.doc_type]:
+                    return self.send(404, b'{"status": 0, "info": "Not found"}')
+                status = mock._admit()
+                if status == 429:
+                    retry_after = math.ceil(1 / mock.rate_limit) if mock.rate_limit else 1
+                    return self.send(429, b'{"status": 0, "info": "Too many requests"}',
+                                     [("Retry-After", str(retry_after))])
+                if status:
+                    return self.send(status, b'{"status": 0, "info": "Service unavailable"}')
+                rest = parts[parts.index("documents") + 2:]
+                if rest:
+                    document = mock.by_id.get(rest[0])
+                    if document is None:
+                        return self.send(404, b'{"status": 0, "info": "Document not found"}')
+                    return self.send(200, json.dumps(document).encode())
+                self.send(200, json.dumps(mock.listing(parse_qs(url.query))).encode())
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second before 429")
+    args = parser.parse_args()
+    mock = MockHolded(args.documents, args.page_size, args.latency, args.error_rate,
+                      args.rate_limit, port=args.port)
+    print(f"Serving {len(mock.documents)} waybills on {mock.url}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+        print(mock.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------- ABO INDEX ----------
+class AboIndex:
+    """ABO -> row positions of a spend report, with exact, multi-key and prefix lookups."""
+
+    def __init__(self, abos):
+        keys = pd.Series(abos, dtype=object).str.strip().str.upper()
+        codes, uniques = pd.factorize(keys)
+        # Row positions grouped by key: rows of key k are order[starts[k]:starts[k + 1]]
+        valid = np.flatnonzero(codes >= 0)
+        self._order = valid[np.argsort(codes[valid], kind="stable")]
+        self._starts = np.searchsorted(codes[self._order], np.arange(len(uniques) + 1))
+        self._codes = {key: code for code, key in enumerate(uniques)}
+        # Keys in sorted order for prefix range scans
+        self._sorted_codes = np.argsort(np.asarray(uniques, dtype=str))
+        self._sorted_keys = np.asarray(uniques, dtype=str)[self._sorted_codes]
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, abo):
+        return str(abo).strip().upper() in self._codes
+
+    def _rows(self, code):
+        return self._order[self._starts[code]:self._starts[code + 1]]
+
+    def get(self, abo):
+        """Row positions of one ABO (empty if unknown)."""
+        code = self._codes.get(str(abo).strip().upper())
+        return self._rows(code) if code is not None else np.empty(0, dtype=np.intp)
+
+    def prefix(self, prefix):
+        """Row positions of every ABO starting with prefix."""
+        prefix = str(prefix).strip().upper()
+        lo = np.searchsorted(self._sorted_keys, prefix, side="left")
+        hi = np.searchsorted(self._sorted_keys, prefix + "\uffff", side="left")
+        rows = [self._rows(code) for code in self._sorted_codes[lo:hi]]
+        return np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.intp)
+
+    def lookup(self, abos):
+        """Sorted, de-duplicated row positions of several ABOs, and the ABOs not found.
+
+        Entries ending in '*' are prefix lookups.
+        """
+        rows, missing = [], []
+        for abo in dict.fromkeys(str(a).strip().upper() for a in abos):
+            found = self.prefix(abo[:-1]) if abo.endswith("*") else self.get(abo)
+            if found.size:
+                rows.append(found)
+            else:
+                missing.append(abo)
+        positions = np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.intp)
+        return positions, missing
+
+
+# ---------- DATE INDEX ----------
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def parse_dates(values):
+    """Parse dd/mm/yyyy dates, falling back to day-first inference for other layouts."""
+    values = pd.Series(values, dtype=object)
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], errors="coerce", dayfirst=True)
+    return dates.to_numpy(dtype="datetime64[ns]")
+
+
+class DateIndex:
+    """Row positions of a spend report kept sorted by booking date, for O(log n) range queries."""
+
+    def __init__(self, dates):
+        self.dates = parse_dates(dates)
+        dated = np.flatnonzero(~np.isnat(self.dates))
+        # Positions in date order; rows without a date are left out
+        self._order = dated[np.argsort(self.dates[dated], kind="stable")]
+        self._sorted = self.dates[self._order]
+        self._rank = np.full(len(self.dates), len(self._order), dtype=np.intp)
+        self._rank[self._order] = np.arange(len(self._order))
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def latest(self):
+        return pd.Timestamp(self._sorted[-1]) if len(self._sorted) else pd.NaT
+
+    def between(self, start, end):
+        """Positions with start <= date <= end, in ascending date order."""
+        if pd.isna(start) or pd.isna(end):
+            return self._order[:0]
+        lo = np.searchsorted(self._sorted, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        hi = np.searchsorted(self._sorted, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+        return self._order[lo:hi]
+
+    def sort_desc(self, positions):
+        """positions ordered newest first, rows without a date last."""
+        positions = np.asarray(positions, dtype=np.intp)
+        rank, last = self._rank[positions], len(self._order)
+        # Rows sharing a date get the same key, so ties keep their row order
+        newer = last - np.searchsorted(self._sorted, self.dates[positions], side="right")
+        return positions[np.lexsort((positions, np.where(rank == last, last, newer)))]
+
+    def format(self, positions, date_format=DATE_FORMAT):
+        """Formatted dates of the given rows only."""
+        return pd.Series(self.dates[positions]).dt.strftime(date_format).to_numpy(dtype=object)
@@ -0,0 +1,528 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from zones import (
+    get_zone_austria, get_zone_belgium, get_zone_croatia, get_zone_czech,
+    get_zone_denmark, get_zone_estonia, get_zone_finland, get_zone_france,
+    get_zone_germany, get_zone_ireland, get_zone_netherlands, get_zone_switzerland,
+    get_zone_uk, zone_column,
+)
+
+
+# ---------- WEIGHT TIERS ----------
+TIERS = [
+    "up to 30 kg", "up to 50 kg", "up to 100 kg", "up to 200 kg", "up to 300 kg",
+    "up to 400 kg", "up to 500 kg", "up to 600 kg", "up to 700 kg", "up to 800 kg",
+    "up to 900 kg", "up to 1000 kg", "up to 2000 kg", "up to 3000 kg",
+]
+# Lower bound (inclusive) of every tier after the first, kept sorted for searchsorted.
+# Anything from 2000 kg up, and missing weights, fall in the last tier.
+TIER_BREAKS = np.array([30, 50, 100, 200, 300, 400, 500, 600, 700, 800, 900, 1000, 2000], dtype=float)
+# Tiers above this one are priced per started 100 kg on top of its price
+BASE_TIER = TIERS.index("up to 1000 kg")
+
+
+def tier_index(weights):
+    """Integer tier (index into TIERS) for a scalar or a whole weight column."""
+    return np.searchsorted(TIER_BREAKS, weights, side="right")
+
+
+def get_weight_tier(weight):
+    return TIERS[tier_index(weight)]
+
+
+def tariff_price(matrix, tier, zone_index, weight):
+    """Price rows already resolved to a tier and a 0-based zone index."""
+    base = matrix[np.minimum(tier, BASE_TIER), zone_index]
+    rate = matrix[tier, zone_index]
+    # 1000-2000 kg and 2000-3000 kg are the 1000 kg price plus a rate per started 100 kg
+    steps = np.ceil((weight - 1000 * (tier - BASE_TIER)) / 100)
+    return np.where(tier <= BASE_TIER, rate, base + steps * rate)
+
+
+def get_price(weight_class, zone, matrix, weight):
+    try:
+        price = float(tariff_price(matrix, TIERS.index(weight_class), zone - 1, weight))
+        return None if math.isnan(price) else price
+    except Exception:
+        return None
+
+
+# ---------- MATRIXES ----------
+# tier x zone, one row per entry of TIERS. Flat-rate countries have a single zone column.
+france_price_matrix = np.array([
+    [36.98, 38.62, 40.46, 41.31, 44.02, 43.59, 45.32, 47.07, 45.32, 47.43, 47.91, 49.12],  # up to 30 kg
+    [40.75, 44.81, 45.38, 46.79, 50.30, 47.43, 51.70, 51.99, 52.48, 52.61, 53.39, 55.41],  # up to 50 kg
+    [47.33, 51.95, 54.86, 57.65, 63.20, 54.17, 59.04, 61.47, 67.54, 62.72, 64.27, 68.30],  # up to 100 kg
+    [58.32, 63.63, 70.62, 75.82, 84.95, 69.95, 75.54, 81.75, 92.99, 84.05, 86.93, 94.39],  # up to 200 kg
+    [73.47, 79.82, 91.10, 98.89, 112.03, 90.40, 97.08, 107.24, 124.10, 110.68, 114.99, 126.20],  # up to 300 kg
+    [87.47, 94.83, 110.45, 120.82, 137.98, 109.69, 117.45, 131.59, 154.07, 136.18, 141.93, 156.87],  # up to 400 kg
+    [101.42, 109.84, 129.75, 142.71, 163.88, 128.94, 137.80, 155.89, 183.98, 161.63, 168.81, 187.50],  # up to 500 kg
+    [108.19, 117.10, 139.97, 154.66, 178.41, 139.17, 148.55, 169.37, 201.20, 175.87, 184.01, 205.17],  # up to 600 kg
+    [120.62, 130.50, 157.44, 174.58, 202.10, 156.59, 167.00, 191.54, 228.69, 199.14, 208.64, 233.31],  # up to 700 kg
+    [133.48, 144.31, 175.31, 194.89, 226.21, 174.45, 185.86, 214.14, 256.59, 222.82, 233.67, 261.88],  # up to 800 kg
+    [145.51, 157.33, 192.39, 214.42, 249.52, 191.48, 203.93, 235.94, 283.70, 245.71, 257.92, 289.65],  # up to 900 kg
+    [158.35, 171.12, 210.27, 234.75, 273.62, 209.32, 222.77, 258.54, 311.59, 269.39, 282.94, 318.21],  # up to 1000 kg
+    [13.89, 14.99, 18.87, 21.27, 25.00, 18.81, 19.97, 23.53, 28.70, 24.59, 25.91, 29.35],  # up to 2000 kg
+    [12.08, 12.91, 15.95, 17.81, 20.76, 16.92, 17.80, 20.58, 21.89, 21.41, 22.43, 25.11],  # up to 3000 kg
+])
+
+
+belgium_price_matrix = np.array([
+    [46.32, 54.73, 56.87, 59.00],  # up to 30 kg
+    [48.84, 57.25, 59.39, 61.52],  # up to 50 kg
+    [54.06, 62.60, 65.69, 68.78],  # up to 100 kg
+    [66.20, 74.44, 79.97, 85.50],  # up to 200 kg
+    [84.15, 92.82, 101.62, 110.43],  # up to 300 kg
+    [100.94, 110.03, 122.12, 134.20],  # up to 400 kg
+    [117.70, 127.20, 142.57, 157.93],  # up to 500 kg
+    [124.72, 133.98, 150.81, 167.64],  # up to 600 kg
+    [139.77, 149.43, 169.36, 189.29],  # up to 700 kg
+    [151.61, 161.42, 182.50, 203.59],  # up to 800 kg
+    [165.78, 175.95, 199.87, 223.80],  # up to 900 kg
+    [180.76, 191.29, 218.06, 244.82],  # up to 1000 kg
+    [15.34, 15.98, 18.30, 20.62],  # up to 2000 kg
+    [14.66, 15.22, 17.47, 19.73],  # up to 3000 kg
+])
+
+
+czech_price_matrix = np.array([
+    [39.82, 41.04, 42.15, 42.25, 43.37, 44.58],  # up to 30 kg
+    [43.26, 46.27, 45.59, 46.46, 48.60, 48.79],  # up to 50 kg
+    [46.67, 49.93, 48.89, 51.56, 52.15, 53.78],  # up to 100 kg
+    [63.44, 67.17, 67.54, 71.32, 71.28, 75.42],  # up to 200 kg
+    [84.27, 88.74, 90.44, 95.52, 94.90, 101.69],  # up to 300 kg
+    [104.02, 109.19, 112.24, 118.64, 117.41, 126.85],  # up to 400 kg
+    [123.71, 129.63, 133.99, 141.71, 139.90, 151.98],  # up to 500 kg
+    [134.68, 140.95, 146.32, 154.86, 152.59, 166.50],  # up to 600 kg
+    [152.57, 159.51, 166.14, 175.91, 173.09, 189.49],  # up to 700 kg
+    [170.85, 178.48, 186.37, 197.37, 193.99, 212.88],  # up to 800 kg
+    [188.36, 196.67, 205.82, 218.06, 214.13, 235.51],  # up to 900 kg
+    [206.62, 215.61, 226.02, 239.51, 235.00, 258.90],  # up to 1000 kg
+    [18.90, 19.67, 20.79, 22.05, 21.56, 23.94],  # up to 2000 kg
+    [17.55, 18.13, 19.44, 19.99, 20.02, 21.88],  # up to 3000 kg
+])
+
+
+denmark_price_matrix = np.array([
+    [48.03, 48.13, 51.07, 51.40, 53.77, 52.65, 54.10],  # up to 30 kg
+    [51.65, 53.81, 55.65, 56.19, 57.39, 58.22, 58.47],  # up to 50 kg
+    [57.92, 60.39, 64.31, 65.39, 63.66, 64.68, 66.71],  # up to 100 kg
+    [79.69, 82.15, 90.00, 92.01, 90.32, 90.67, 95.84],  # up to 200 kg
+    [106.39, 109.01, 121.11, 124.12, 122.34, 122.07, 130.52],  # up to 300 kg
+    [131.95, 134.76, 151.10, 155.11, 153.21, 152.38, 164.15],  # up to 400 kg
+    [157.49, 160.49, 181.02, 186.04, 184.06, 182.66, 197.71],  # up to 500 kg
+    [172.05, 175.08, 198.43, 204.12, 202.15, 200.33, 217.65],  # up to 600 kg
+    [195.40, 198.62, 225.94, 232.59, 230.52, 228.19, 248.63],  # up to 700 kg
+    [219.18, 222.58, 253.87, 261.45, 259.31, 256.46, 280.00],  # up to 800 kg
+    [242.16, 245.77, 281.01, 289.54, 287.31, 283.97, 310.63],  # up to 900 kg
+    [265.91, 269.71, 308.92, 318.41, 316.08, 312.23, 341.99],  # up to 1000 kg
+    [24.14, 24.48, 27.62, 28.15, 28.81, 28.91, 31.88],  # up to 2000 kg
+    [22.44, 22.52, 25.39, 26.70, 27.66, 28.43, 30.86],  # up to 3000 kg
+])
+
+
+finland_price_matrix = np.array([
+    [64.82, 73.07, 74.60, 76.13, 76.97, 77.62, 79.60, 82.57, 87.51],  # up to 30 kg
+    [67.24, 75.49, 77.02, 78.56, 79.40, 80.04, 82.02, 84.99, 89.94],  # up to 50 kg
+    [71.92, 80.26, 82.66, 85.07, 86.26, 87.16, 89.94, 94.12, 101.08],  # up to 100 kg
+    [100.52, 108.48, 113.14, 117.81, 119.85, 121.42, 126.23, 133.44, 145.47],  # up to 200 kg
+    [135.97, 144.22, 151.88, 159.54, 162.76, 165.21, 172.77, 184.11, 203.01],  # up to 300 kg
+    [170.31, 178.85, 189.51, 200.16, 204.54, 207.89, 218.20, 233.67, 259.44],  # up to 400 kg
+    [204.61, 213.44, 224.91, 240.74, 246.29, 250.54, 263.59, 283.18, 315.83],  # up to 500 kg
+    [223.68, 232.23, 247.24, 262.25, 268.31, 272.95, 287.22, 308.63, 344.32],  # up to 600 kg
+    [255.33, 264.15, 278.46, 299.82, 306.99, 312.47, 329.34, 354.65, 396.82],  # up to 700 kg
+    [284.57, 293.49, 306.57, 331.28, 338.87, 344.67, 362.51, 389.27, 433.88],  # up to 800 kg
+    [315.45, 324.63, 346.12, 367.61, 376.20, 382.77, 402.99, 433.33, 483.88],  # up to 900 kg
+    [347.12, 356.55, 380.63, 404.71, 414.32, 421.66, 444.26, 478.16, 534.66],  # up to 1000 kg
+    [31.74, 32.29, 34.39, 36.49, 37.32, 37.95, 39.90, 42.83, 47.71],  # up to 2000 kg
+    [29.82, 30.36, 32.40, 34.54, 35.46, 36.24, 38.55, 40.76, 45.66],  # up to 3000 kg
+])
+
+
+germany_price_matrix = np.array([
+    [32.37, 36.42, 37.44, 33.79, 37.60, 39.06, 36.28, 38.81, 37.47, 38.48, 39.09, 40.00],  # up to 30 kg
+    [36.39, 40.08, 41.47, 38.02, 41.64, 43.29, 39.51, 43.20, 41.91, 42.48, 43.39, 44.04],  # up to 50 kg
+    [42.48, 45.68, 47.35, 44.03, 47.43, 49.97, 44.91, 49.66, 47.57, 48.58, 50.19, 51.45],  # up to 100 kg
+    [55.14, 61.14, 64.17, 57.74, 64.32, 68.66, 60.73, 67.88, 64.06, 66.45, 69.07, 71.75],  # up to 200 kg
+    [71.58, 80.62, 85.13, 75.35, 85.34, 91.67, 80.52, 90.42, 84.69, 88.53, 92.28, 96.47],  # up to 300 kg
+    [86.93, 98.96, 104.99, 91.85, 105.27, 113.59, 99.20, 111.85, 104.20, 109.53, 114.41, 120.14],  # up to 400 kg
+    [102.24, 117.29, 124.81, 108.31, 125.17, 135.48, 117.85, 133.25, 123.69, 130.48, 136.49, 143.73],  # up to 500 kg
+    [110.26, 127.28, 135.83, 117.09, 136.24, 147.83, 128.15, 145.29, 134.45, 142.25, 148.99, 157.27],  # up to 600 kg
+    [123.99, 143.83, 153.81, 131.91, 154.29, 167.76, 145.04, 164.76, 152.13, 161.31, 169.13, 178.84],  # up to 700 kg
+    [138.10, 160.78, 172.20, 147.12, 172.74, 188.09, 162.31, 184.64, 170.20, 180.77, 189.64, 200.79],  # up to 800 kg
+    [151.47, 176.95, 189.82, 161.58, 190.44, 207.65, 178.83, 203.75, 187.50, 199.47, 209.39, 221.99],  # up to 900 kg
+    [165.58, 193.90, 208.19, 176.79, 208.87, 227.97, 196.10, 223.62, 205.56, 218.91, 229.90, 243.94],  # up to 1000 kg
+    [14.88, 17.63, 19.03, 15.95, 19.09, 20.94, 17.89, 20.51, 18.75, 20.06, 21.12, 22.50],  # up to 2000 kg
+    [13.28, 16.26, 17.52, 14.39, 17.62, 19.12, 16.60, 18.78, 17.31, 18.48, 19.26, 20.43],  # up to 3000 kg
+])
+
+
+uk_price_matrix = np.array([
+    [46.95, 52.13, 57.83, 73.17, 83.46, 92.96, 95.59, 103.25],  # up to 30 kg
+    [49.32, 54.50, 60.20, 75.54, 85.83, 95.33, 97.96, 105.61],  # up to 50 kg
+    [54.51, 59.59, 67.42, 88.25, 100.91, 113.58, 102.50, 126.24],  # up to 100 kg
+    [67.45, 72.14, 80.72, 99.13, 114.35, 128.05, 114.22, 141.75],  # up to 200 kg
+    [112.14, 117.65, 126.26, 147.62, 161.32, 176.54, 158.91, 190.24],  # up to 300 kg
+    [135.75, 142.85, 153.74, 172.56, 189.30, 204.52, 190.66, 221.27],  # up to 400 kg
+    [160.60, 167.74, 185.05, 208.87, 222.57, 236.27, 219.13, 251.49],  # up to 500 kg
+    [178.21, 189.08, 191.11, 223.79, 243.91, 264.03, 240.92, 284.14],  # up to 600 kg
+    [197.22, 208.10, 210.13, 242.81, 262.92, 283.04, 259.94, 303.16],  # up to 700 kg
+    [240.14, 250.27, 267.99, 297.51, 321.94, 344.93, 296.77, 367.92],  # up to 800 kg
+    [258.77, 268.89, 286.62, 316.14, 340.57, 363.56, 315.40, 386.55],  # up to 900 kg
+    [278.18, 288.31, 306.04, 335.56, 359.98, 382.97, 334.81, 405.96],  # up to 1000 kg
+    [24.74, 25.29, 26.63, 28.65, 30.47, 32.29, 30.41, 33.97],  # up to 2000 kg
+    [22.63, 22.93, 24.03, 25.34, 26.77, 28.20, 27.00, 29.56],  # up to 3000 kg
+])
+
+
+poland_price_matrix = np.array([
+    [50.50],  # up to 30 kg
+    [52.93],  # up to 50 kg
+    [57.33],  # up to 100 kg
+    [76.54],  # up to 200 kg
+    [99.35],  # up to 300 kg
+    [120.99],  # up to 400 kg
+    [142.60],  # up to 500 kg
+    [153.33],  # up to 600 kg
+    [172.97],  # up to 700 kg
+    [190.68],  # up to 800 kg
+    [209.61],  # up to 900 kg
+    [229.34],  # up to 1000 kg
+    [20.27],  # up to 2000 kg
+    [20.41],  # up to 3000 kg
+])
+
+
+ireland_price_matrix = np.array([
+    [59.67, 68.51, 69.92, 71.32, 72.23],  # up to 30 kg
+    [62.15, 70.99, 72.40, 73.80, 74.70],  # up to 50 kg
+    [66.84, 75.76, 78.08, 80.39, 81.66],  # up to 100 kg
+    [89.60, 98.09, 102.75, 107.42, 109.61],  # up to 200 kg
+    [118.81, 127.57, 135.35, 143.12, 146.56],  # up to 300 kg
+    [146.88, 155.92, 166.80, 177.68, 182.37],  # up to 400 kg
+    [174.91, 184.23, 198.21, 212.20, 218.14],  # up to 500 kg
+    [189.77, 198.76, 214.16, 229.56, 236.06],  # up to 600 kg
+    [215.48, 224.73, 243.06, 261.40, 269.08],  # up to 700 kg
+    [238.91, 248.25, 267.69, 287.12, 295.24],  # up to 800 kg
+    [263.87, 273.46, 295.58, 317.70, 326.90],  # up to 900 kg
+    [289.63, 299.45, 324.26, 349.07, 359.36],  # up to 1000 kg
+    [26.21, 26.81, 29.04, 32.26, 32.38],  # up to 2000 kg
+    [25.30, 25.32, 27.52, 30.91, 31.41],  # up to 3000 kg
+])
+
+
+netherlands_price_matrix = np.array([
+    [42.39, 49.17, 50.93, 52.68],  # up to 30 kg
+    [44.95, 51.74, 53.49, 55.25],  # up to 50 kg
+    [49.92, 56.80, 59.33, 61.87],  # up to 100 kg
+    [62.69, 69.32, 73.84, 78.37],  # up to 200 kg
+    [80.77, 87.73, 90.89, 102.13],  # up to 300 kg
+    [97.68, 104.96, 114.84, 124.71],  # up to 400 kg
+    [114.55, 122.15, 134.70, 147.25],  # up to 500 kg
+    [122.09, 129.51, 143.25, 156.99],  # up to 600 kg
+    [137.24, 144.96, 161.23, 177.49],  # up to 700 kg
+    [149.81, 157.64, 174.86, 192.07],  # up to 800 kg
+    [164.15, 172.27, 191.80, 211.33],  # up to 900 kg
+    [179.32, 187.72, 209.56, 231.41],  # up to 1000 kg
+    [16.42, 16.54, 19.66, 20.88],  # up to 2000 kg
+    [14.86, 15.30, 17.61, 18.98],  # up to 3000 kg
+])
+
+
+austria_price_matrix = np.array([
+    [44.93, 46.37, 46.22, 47.66, 47.79, 47.93, 48.10, 49.37, 48.48, 49.07, 50.78, 51.10],  # up to 30 kg
+    [48.48, 51.99, 49.77, 53.27, 52.23, 51.48, 52.74, 54.98, 53.37, 53.51, 55.23, 55.73],  # up to 50 kg
+    [54.55, 58.56, 55.83, 59.84, 60.55, 57.55, 61.57, 61.55, 62.84, 61.83, 63.54, 64.57],  # up to 100 kg
+    [74.61, 79.20, 76.99, 81.58, 84.29, 80.17, 86.17, 84.76, 88.53, 86.67, 89.84, 91.72],  # up to 200 kg
+    [99.35, 104.84, 102.92, 108.40, 113.17, 107.68, 115.98, 113.17, 119.52, 116.73, 121.49, 124.31],  # up to 300 kg
+    [122.96, 129.32, 127.71, 134.07, 140.92, 134.06, 144.68, 140.43, 149.41, 145.67, 152.02, 155.79],  # up to 400 kg
+    [146.53, 153.79, 152.47, 159.73, 168.61, 160.41, 173.33, 167.67, 179.22, 174.55, 182.49, 187.21],  # up to 500 kg
+    [159.85, 167.54, 166.57, 174.27, 184.62, 175.57, 189.96, 183.27, 196.62, 191.34, 200.34, 205.68],  # up to 600 kg
+    [181.38, 189.89, 189.23, 197.74, 210.03, 199.72, 216.25, 208.24, 224.04, 217.88, 228.37, 234.60],  # up to 700 kg
+    [203.31, 212.66, 212.28, 221.63, 235.84, 224.27, 242.96, 233.62, 251.85, 244.81, 256.81, 263.92],  # up to 800 kg
+    [224.43, 234.62, 234.52, 244.71, 260.88, 248.02, 268.89, 258.21, 278.91, 270.97, 284.47, 292.48],  # up to 900 kg
+    [246.35, 257.37, 257.56, 268.59, 286.70, 272.56, 295.60, 283.58, 306.71, 297.92, 312.91, 321.81],  # up to 1000 kg
+    [22.61, 23.55, 23.70, 24.64, 26.47, 25.16, 27.35, 26.11, 28.43, 27.57, 29.03, 29.90],  # up to 2000 kg
+    [21.01, 21.72, 22.10, 22.81, 24.00, 23.56, 24.68, 24.27, 25.53, 25.10, 26.56, 27.23],  # up to 3000 kg
+])
+
+
+switzerland_price_matrix = np.array([
+    [59.77, 59.03, 62.22, 62.66, 64.71, 65.14, 65.24, 65.67],  # up to 30 kg
+    [64.05, 63.22, 70.13, 70.57, 70.55, 70.99, 71.42, 71.86],  # up to 50 kg
+    [72.06, 71.08, 78.97, 79.41, 82.45, 82.88, 84.20, 84.64],  # up to 100 kg
+    [94.70, 93.64, 102.66, 103.46, 111.48, 112.29, 114.75, 115.56],  # up to 200 kg
+    [123.30, 122.06, 132.81, 134.02, 147.24, 148.44, 152.14, 153.35],  # up to 300 kg
+    [150.81, 149.43, 161.83, 163.44, 181.93, 183.54, 188.47, 190.08],  # up to 400 kg
+    [178.27, 176.75, 190.85, 192.86, 216.57, 218.58, 224.73, 226.74],  # up to 500 kg
+    [193.50, 191.94, 206.85, 209.13, 236.45, 238.72, 245.71, 247.99],  # up to 600 kg
+    [218.72, 217.04, 233.51, 236.16, 268.40, 271.06, 279.21, 281.87],  # up to 700 kg
+    [244.36, 242.54, 260.57, 263.61, 300.78, 303.81, 313.11, 316.15],  # up to 800 kg
+    [269.18, 267.25, 286.88, 290.29, 332.40, 335.81, 341.17, 349.70],  # up to 900 kg
+    [294.77, 292.72, 313.91, 317.71, 364.75, 368.55, 369.93, 383.97],  # up to 1000 kg
+    [26.76, 26.60, 28.40, 28.77, 33.47, 33.84, 34.15, 35.35],  # up to 2000 kg
+    [24.21, 24.10, 25.46, 25.83, 29.43, 29.80, 30.59, 30.97],  # up to 3000 kg
+])
+
+
+estonia_price_matrix = np.array([
+    [62.62, 71.36, 71.96, 72.56],  # up to 30 kg
+    [65.05, 73.79, 74.39, 74.99],  # up to 50 kg
+    [69.45, 78.29, 79.69, 81.09],  # up to 100 kg
+    [99.22, 107.66, 111.20, 114.74],  # up to 200 kg
+    [135.47, 144.24, 150.54, 156.83],  # up to 300 kg
+    [170.60, 179.69, 188.75, 197.81],  # up to 400 kg
+    [205.70, 215.11, 226.92, 238.74],  # up to 500 kg
+    [336.38, 345.49, 358.60, 371.70],  # up to 600 kg
+    [341.10, 350.52, 366.23, 381.94],  # up to 700 kg
+    [344.00, 353.53, 370.22, 386.90],  # up to 800 kg
+    [348.04, 357.86, 376.93, 396.00],  # up to 900 kg
+    [352.87, 362.96, 384.42, 405.88],  # up to 1000 kg
+    [35.51, 36.10, 38.00, 39.90],  # up to 2000 kg
+    [31.63, 32.21, 35.08, 37.95],  # up to 3000 kg
+])
+
+
+croatia_price_matrix = np.array([
+    [55.27, 62.63, 62.96, 63.29, 63.98, 64.50, 66.12],  # up to 30 kg
+    [57.76, 65.12, 65.45, 65.78, 66.47, 66.99, 68.61],  # up to 50 kg
+    [62.02, 69.46, 70.44, 71.41, 72.38, 73.12, 75.39],  # up to 100 kg
+    [88.58, 95.69, 98.38, 101.07, 102.73, 104.01, 107.93],  # up to 200 kg
+    [120.95, 128.33, 133.22, 138.10, 140.72, 142.72, 148.89],  # up to 300 kg
+    [152.18, 159.83, 166.91, 173.99, 177.56, 180.29, 188.70],  # up to 400 kg
+    [183.37, 191.28, 200.56, 209.84, 214.36, 217.82, 228.47],  # up to 500 kg
+    [201.08, 208.74, 219.06, 229.37, 234.32, 238.10, 249.74],  # up to 600 kg
+    [229.77, 237.69, 250.07, 262.46, 268.31, 272.78, 286.53],  # up to 700 kg
+    [257.06, 265.08, 278.24, 291.41, 297.59, 302.32, 316.87],  # up to 800 kg
+    [285.12, 293.37, 308.43, 323.50, 330.50, 335.86, 352.35],  # up to 900 kg
+    [313.97, 322.46, 339.42, 356.39, 364.22, 370.21, 388.63],  # up to 1000 kg
+    [28.94, 29.44, 30.94, 32.45, 33.13, 33.64, 35.24],  # up to 2000 kg
+    [21.53, 22.01, 24.29, 26.57, 27.58, 28.35, 30.40],  # up to 3000 kg
+])
+
+
+# Country code -> tariff
+TARIFFS = {
+    "FR": france_price_matrix,
+    "BE": belgium_price_matrix,
+    "CZ": czech_price_matrix,
+    "DK": denmark_price_matrix,
+    "FI": finland_price_matrix,
+    "DE": germany_price_matrix,
+    "GB": uk_price_matrix,
+    "PL": poland_price_matrix,
+    "IE": ireland_price_matrix,
+    "NL": netherlands_price_matrix,
+    "AT": austria_price_matrix,
+    "CH": switzerland_price_matrix,
+    "EE": estonia_price_matrix,
+    "HR": croatia_price_matrix,
+}
+
+
+# ---------- PER-KILOGRAM TABLES ----------
+# Every tier and per-100 kg boundary is a whole kilogram, so the price is constant on
+# each whole kilogram and on each open interval between two. floor(w) + ceil(w) numbers
+# those pieces 0, 1, 2, ... and a table with one row per piece prices any weight exactly.
+MAX_TABLE_WEIGHT = 3000
+_PRICE_TABLES = {}
+
+
+def weight_keys(weights):
+    """Table row for a scalar or a whole weight column: 2w for whole kg, 2*floor(w) + 1 otherwise."""
+    return np.floor(weights) + np.ceil(weights)
+
+
+def compile_price_table(matrix, max_weight=MAX_TABLE_WEIGHT):
+    """(2 * max_weight + 1) x zone prices from 0 to max_weight kg, one row per weight key."""
+    weights = np.arange(2 * max_weight + 1) / 2
+    zones = np.arange(matrix.shape[1])
+    return tariff_price(matrix, tier_index(weights)[:, None], zones[None, :], weights[:, None])
+
+
+def price_table(country_code):
+    """The country's per-kilogram table, compiled on first use."""
+    table = _PRICE_TABLES.get(country_code)
+    if table is None:
+        table = _PRICE_TABLES[country_code] = compile_price_table(TARIFFS[country_code])
+    return table
+
+
+def quote(country_code, zone, weight):
+    """Tariff price for a 1-based zone and a weight, scalars or arrays alike.
+
+    Weights from 0 to MAX_TABLE_WEIGHT are one table lookup; heavier, negative or
+    missing weights go through tariff_price.
+    """
+    table = price_table(country_code)
+    if isinstance(weight, (int, float)) and isinstance(zone, (int, np.integer)):
+        if 0 <= weight <= MAX_TABLE_WEIGHT:
+            return float(table[math.floor(weight) + math.ceil(weight), zone - 1])
+        return float(tariff_price(TARIFFS[country_code], tier_index(weight), zone - 1, weight))
+
+    weight = np.asarray(weight, dtype=float)
+    zone_index = np.asarray(zone, dtype=np.intp) - 1
+    weight, zone_index = np.broadcast_arrays(weight, zone_index)
+    keys = weight_keys(weight)
+    inside = (keys >= 0) & (keys < len(table))
+    price = table[np.where(inside, keys, 0).astype(np.intp), zone_index]
+    if not inside.all():
+        outside = ~inside
+        price[outside] = tariff_price(
+            TARIFFS[country_code], tier_index(weight[outside]), zone_index[outside], weight[outside]
+        )
+    return price
+
+
+# ---------- DISTRIBUTORS ----------
+# Country code -> distributor tariff: the price of 1 to 6 pallets, then a price per
+# pallet for 7-14 and for 15 or more (dedicated truck).
+DISTRIBUTOR_COUNTRIES = ["GB", "IE", "NO", "PT", "DE"]
+#                                1     2     3     4     5     6  7-14   15+
+DISTRIBUTOR_TARIFFS = np.array([
+    [246, 427, 572, 750, 897, 1052, 130, 109],  # GB
+    [210, 370, 540, 716, 895, 1070, 100, 80],  # IE
+    [376, 650, 897, 1164, 1431, 1621, 100, 80],  # NO
+    [113, 178, 231, 298, 358, 410, 100, 80],  # PT
+    [185, 324, 460, 592, 690, 810, 100, 80],  # DE
+], dtype=float)
+STANDARD_PALLETS = 6
+# Per-pallet bands as inclusive (low, high); 14 < pallets < 15 is in neither
+PALLET_BAND_LOWS = np.array([7, 15], dtype=float)
+PALLET_BAND_HIGHS = np.array([14, np.inf])
+
+
+def pallet_prices(tariff, pallets):
+    """Price under one row of DISTRIBUTOR_TARIFFS for a scalar or a whole pallet column.
+
+    NaN where the tariff has no price.
+    """
+    pallets = np.asarray(pallets, dtype=float)
+    # 1-6 whole pallets come from the standard prices
+    standard = (pallets >= 1) & (pallets <= STANDARD_PALLETS) & (pallets == np.floor(pallets))
+    slot = np.where(standard, pallets - 1, 0).astype(np.intp)
+    band = np.searchsorted(PALLET_BAND_LOWS, pallets, side="right") - 1
+    per_pallet = (band >= 0) & (pallets <= PALLET_BAND_HIGHS[band])
+    rate = tariff[STANDARD_PALLETS + np.maximum(band, 0)]
+    return np.where(standard, tariff[slot], np.where(per_pallet, pallets * rate, np.nan))
+
+
+def distributor_prices(country, pallets):
+    return pallet_prices(DISTRIBUTOR_TARIFFS[DISTRIBUTOR_COUNTRIES.index(country)], pallets)
+
+
+def get_distributor_price(country, pallets):
+    if country not in DISTRIBUTOR_COUNTRIES:
+        return None
+    price = float(distributor_prices(country, pallets))
+    return None if math.isnan(price) else price
+
+
+# ---------- COUNTRY REGISTRY ----------
+# Country code -> zone function. Poland is flat rate and has none.
+ZONE_FUNCTIONS = {
+    "FR": get_zone_france,
+    "BE": get_zone_belgium,
+    "CZ": get_zone_czech,
+    "DK": get_zone_denmark,
+    "FI": get_zone_finland,
+    "DE": get_zone_germany,
+    "GB": get_zone_uk,
+    "PL": None,
+    "IE": get_zone_ireland,
+    "NL": get_zone_netherlands,
+    "AT": get_zone_austria,
+    "CH": get_zone_switzerland,
+    "EE": get_zone_estonia,
+    "HR": get_zone_croatia,
+}
+
+# zones maps a ZIP column to float zones (NaN = no zone) and is None for flat-rate
+# countries; tariff and distributor are None where the country has none.
+Country = namedtuple("Country", ["zones", "tariff", "distributor"])
+
+
+def _map_unique(values, func):
+    # Evaluate func once per distinct value instead of once per row
+    inverse, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = np.array([func(v) for v in uniques], dtype=float)
+    return mapped[inverse]
+
+
+def zone_mapper(country_code, zone_func):
+    """Vectorized zone lookup: the compiled table if zones.py has one, else zone_func per distinct code."""
+    if zone_func is None:
+        return None
+
+    def zones(zipcodes):
+        compiled = zone_column(country_code, zipcodes)
+        if compiled is None:
+            return _map_unique(zipcodes, zone_func)
+        return np.where(compiled > 0, compiled, np.nan)
+
+    return zones
+
+
+def _distributor(country_code):
+    if country_code not in DISTRIBUTOR_COUNTRIES:
+        return None
+    return DISTRIBUTOR_TARIFFS[DISTRIBUTOR_COUNTRIES.index(country_code)]
+
+
+# ISO country code -> how to price it; the one place that dispatches on country
+COUNTRIES = {
+    code: Country(zone_mapper(code, ZONE_FUNCTIONS.get(code)), TARIFFS.get(code), _distributor(code))
+    for code in dict.fromkeys([*TARIFFS, *DISTRIBUTOR_COUNTRIES])
+}
+
+
+# ---------- BATCH PRICING ----------
+def price_frame(df, use_distributor=True, zone_memo=None):
+    """Zone and calculated price for every row of a normalized spend report.
+
+    With a zones.ZoneMemo, zones already known for a (country, postcode) are reused.
+    """
+    n = len(df)
+    weight = df["Gross weight (kgs)"].to_numpy(dtype=float)
+    # Row positions per country code, built in a single pass
+    groups = df.groupby(df["Consignee Country / UN Code"].to_numpy(), sort=False).indices
+    zipcodes = df["Consignee ZIP Code"].to_numpy(dtype=object)
+    pallets = pd.to_numeric(df["Packages"], errors="coerce").to_numpy(dtype=float)
+
+    price = np.full(n, np.nan)
+    zone = np.full(n, np.nan)
+    flat_rate = np.zeros(n, dtype=bool)
+
+    for code, rows in groups.items():
+        country = COUNTRIES.get(code)
+        if country is None:
+            continue
+        if use_distributor and country.distributor is not None:
+            price[rows] = pallet_prices(country.distributor, pallets[rows])
+            rows = rows[np.isnan(price[rows])]
+        if country.tariff is None:
+            continue
+        if country.zones is None:
+            zones = np.ones(rows.size)
+            flat_rate[rows] = True
+        else:
+            if zone_memo is None:
+                zones = country.zones(zipcodes[rows])
+            else:
+                zones = zone_memo.zones(code, zipcodes[rows], country.zones)
+            zone[rows] = zones
+        known = ~np.isnan(zones)
+        rows, zones = rows[known], zones[known].astype(np.intp)
+        price[rows] = quote(code, zones, weight[rows])
+
+    labels = np.full(n, "N/A (Distributor)", dtype=object)
+    resolved = ~np.isnan(zone)
+    labels[resolved] = zone[resolved].astype(int)
+    labels[flat_rate] = "Flat Rate"
+    # Matches the per-row loop: zero or missing prices are "not available"
+    price[price == 0] = np.nan
+    return pd.DataFrame({"Zone": labels, "Calculated Price": price}, index=df.index)
@@ -0,0 +1,123 @@
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import pandas as pd
+
+from holded import WAYBILL_FIELDS
+from indexes import AboIndex
+from pricing import price_frame
+
+
+Reconciliation = namedtuple("Reconciliation", ["matched", "kn_only", "holded_only"])
+
+WAYBILL_COLUMNS = {
+    "docNumber": "Holded Doc Number",
+    "date": "Holded Date",
+    "contactName": "Holded Contact",
+    "id": "Holded Id",
+}
+
+
+def _key(values):
+    return pd.Series(values, dtype=object).astype(str).str.strip().str.upper()
+
+
+def waybill_frame(waybills):
+    """Holded waybills (documents or a DataFrame of them) keyed by normalized docNumber."""
+    wb = pd.DataFrame(waybills)
+    wb = wb.reindex(columns=list(WAYBILL_COLUMNS)).rename(columns=WAYBILL_COLUMNS)
+    wb["Holded Date"] = pd.to_datetime(wb["Holded Date"], unit="s", errors="coerce")
+    wb["_key"] = _key(wb["Holded Doc Number"]).to_numpy()
+    # One waybill per albarán: the most recent wins if Holded has duplicates
+    wb = wb[wb["Holded Doc Number"].notna()].sort_values("Holded Date", kind="stable")
+    return wb.drop_duplicates("_key", keep="last")
+
+
+def reconcile(kn_df, waybills, use_distributor=True):
+    """Join every Holded waybill against the KN 'ABO' column in one hash join.
+
+    Returns the matched rows with calculated vs invoiced prices, the KN rows with no
+    waybill and the waybills with no KN row.
+    """
+    kn = kn_df.join(price_frame(kn_df, use_distributor=use_distributor))
+    kn_columns = list(kn.columns)
+    kn["_key"] = _key(kn["ABO"]).to_numpy()
+    kn["_row"] = range(len(kn))
+    # Rows without an ABO can never match, but they still belong in kn_only
+    no_abo = kn["ABO"].isna().to_numpy()
+    wb = waybill_frame(waybills)
+
+    merged = kn[~no_abo].merge(wb, on="_key", how="outer", indicator=True, sort=False)
+    merged["Difference (€)"] = merged["Spend in EUR"] - merged["Calculated Price"]
+    side = merged.pop("_merge")
+    kn_only = pd.concat([merged[side == "left_only"], kn[no_abo]]).sort_values("_row", kind="stable")
+    merged = merged.drop(columns=["_key", "_row"])
+    return Reconciliation(
+        matched=merged[side == "both"].reset_index(drop=True),
+        kn_only=kn_only[kn_columns].reset_index(drop=True),
+        holded_only=merged.loc[side == "right_only", list(wb.columns.drop("_key"))].reset_index(drop=True),
+    )
+
+
+# ---------- PIPELINE ----------
+def reconcile_batch(kn_df, abo_index, waybills, use_distributor=True):
+    """Matched rows for one page of waybills, pricing only the KN rows they refer to."""
+    positions, _ = abo_index.lookup(doc["docNumber"] for doc in waybills if doc.get("docNumber"))
+    return reconcile(kn_df.iloc[positions], waybills, use_distributor).matched
+
+
+async def _produce(pages, queue, workers):
+    try:
+        while (page := await asyncio.to_thread(next, pages, None)) is not None:
+            await queue.put(page)
+    finally:
+        for _ in range(workers):
+            await queue.put(None)
+
+
+async def _consume(queue, price_batch, write):
+    while (page := await queue.get()) is not None:
+        write(await price_batch(page))
+
+
+async def reconcile_pipeline(kn_df, client, output_path, doc_type="waybill", params=None,
+                             use_distributor=True, workers=2, queue_size=4, executor=None):
+    """Reconcile waybills while they download: one task fetches and decodes Holded pages,
+    workers price the pages already received, and matched rows are appended to
+    output_path as each batch completes. Returns the number of matched rows written.
+
+    A docNumber repeated on a later page is only matched the first time it is written.
+    Batches run on a thread pool by default; any concurrent.futures executor can be passed,
+    and is left running for the caller to reuse.
+    """
+    loop = asyncio.get_running_loop()
+    abo_index = AboIndex(kn_df["ABO"])
+    queue = asyncio.Queue(maxsize=queue_size)
+    pages = client.iter_pages(doc_type, params, WAYBILL_FIELDS)
+    written = 0
+    seen = set()
+
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as out, \
+            (nullcontext(executor) if executor else ThreadPoolExecutor(max_workers=workers)) as pool:
+
+        def price_batch(page):
+            return loop.run_in_executor(pool, reconcile_batch, kn_df, abo_index, page, use_distributor)
+
+        def write(matched):
+            nonlocal written
+            keys = _key(matched["Holded Doc Number"])
+            matched = matched[~keys.isin(seen).to_numpy()]
+            seen.update(keys)
+            if matched.empty:
+                return
+            # Batches without matches write nothing, so the header goes out exactly once
+            matched.to_csv(out, header=written == 0, index=False)
+            written += len(matched)
+
+        await asyncio.gather(
+            _produce(pages, queue, workers),
+            *(_consume(queue, price_batch, write) for _ in range(workers)),
+        )
+    return written
@@ -0,0 +1,210 @@
+import glob
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from pricing import price_frame
+from zones import normalize_postcodes
+
+
+# Columns of the KN spend report used for pricing, in display order
+SPEND_REPORT_COLUMNS = [
+    'Shipment Creation/Booking Date (Day)', 'ABO', 'Spend in EUR', "Volume (m3)",
+    'Gross weight (kgs)', "Consignee ZIP Code", "Destination",
+    "Consignee Country", "Consignee Country / UN Code", "Packages"
+]
+
+# Numbers are exported in European format ("1.234,56"): the parser handles them directly.
+# The other columns are text, even in a chunk where every value is blank or numeric:
+# parsing postcodes (or ABOs) as numbers drops leading zeros.
+SPEND_REPORT_DTYPES = {
+    'Shipment Creation/Booking Date (Day)': "str",
+    'ABO': "str",
+    "Consignee ZIP Code": "str",
+    "Destination": "str",
+    "Consignee Country": "str",
+    "Consignee Country / UN Code": "str",
+    'Spend in EUR': "float64",
+    "Volume (m3)": "float64",
+    'Gross weight (kgs)': "float64",
+    "Packages": "float64",
+}
+
+CSV_OPTIONS = dict(
+    sep=';', header=1, usecols=SPEND_REPORT_COLUMNS, dtype=SPEND_REPORT_DTYPES,
+    decimal=',', thousands='.',
+)
+
+
+def normalize_spend_report(df, columns=SPEND_REPORT_COLUMNS):
+    df = df[columns]
+    df["Consignee Country"] = df["Consignee Country"].str.title()
+    df["Consignee ZIP Code"] = normalize_postcodes(df["Consignee ZIP Code"], df["Consignee Country / UN Code"])
+    return df
+
+
+def read_spend_report(file_path):
+    """Read the KN spend report (semicolon CSV, header on the second line)."""
+    return normalize_spend_report(pd.read_csv(file_path, **CSV_OPTIONS))
+
+
+# ---------- PARQUET CACHE ----------
+CACHE_DIR = ".cache"
+# Bump when normalize_spend_report changes so old caches are not reused
+CACHE_VERSION = 2
+
+
+def file_digest(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(file_path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(file_path))[0].replace(" ", "_")
+    return os.path.join(cache_dir, f"{stem}-v{CACHE_VERSION}-{file_digest(file_path)[:16]}.parquet")
+
+
+def load_spend_report(file_path, cache_dir=CACHE_DIR):
+    """read_spend_report through a Parquet cache keyed by the report's content hash."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return read_spend_report(file_path)
+
+    path = cache_path(file_path, cache_dir)
+    if os.path.exists(path):
+        return pd.read_parquet(path, memory_map=True)
+
+    df = read_spend_report(file_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Drop artifacts of older versions of this report, then write atomically
+    for stale in glob.glob(path.rsplit("-v", 1)[0] + "-v*.parquet"):
+        os.remove(stale)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return df
+
+
+# ---------- STREAMING ----------
+DEFAULT_MEMORY_LIMIT_MB = 256
+_SAMPLE_ROWS = 1000
+
+
+def _bytes_per_row(file_path):
+    # Raw line held by the tokenizer plus the parsed row kept in the chunk
+    sample = pd.read_csv(file_path, nrows=_SAMPLE_ROWS, **CSV_OPTIONS)
+    if sample.empty:
+        return 1
+    with open(file_path, "rb") as f:
+        f.readline()
+        f.readline()
+        raw = sum(len(f.readline()) for _ in range(len(sample)))
+    parsed = sample.memory_usage(index=True, deep=True).sum()
+    return max(1, int((raw + parsed) / len(sample)))
+
+
+def chunk_rows(file_path, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB):
+    """Rows per chunk so that one chunk stays under memory_limit_mb."""
+    return max(1, int(memory_limit_mb * 1024 * 1024 // _bytes_per_row(file_path)))
+
+
+def iter_spend_report(file_path, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, chunksize=None):
+    """Yield the spend report as normalized chunks instead of one DataFrame."""
+    chunksize = chunksize or chunk_rows(file_path, memory_limit_mb)
+    with pd.read_csv(file_path, chunksize=chunksize, **CSV_OPTIONS) as reader:
+        for chunk in reader:
+            yield normalize_spend_report(chunk)
+
+
+def iter_priced_report(file_path, use_distributor=True, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, chunksize=None):
+    """Yield each normalized chunk with its Zone and Calculated Price columns."""
+    for chunk in iter_spend_report(file_path, memory_limit_mb, chunksize):
+        yield chunk.join(price_frame(chunk, use_distributor=use_distributor))
+
+
+def write_priced_report(file_path, output_path, use_distributor=True,
+                        memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, chunksize=None):
+    """Price the report chunk by chunk, appending to output_path. Returns the row count."""
+    rows = 0
+    chunks = iter_priced_report(file_path, use_distributor, memory_limit_mb, chunksize)
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as out:
+        for chunk in chunks:
+            chunk.to_csv(out, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+# ---------- INCREMENTAL STORE ----------
+STORE_DIR = "kn_store"
+# A shipment line on an invoice; a later export with the same key replaces the row
+KEY_COLUMNS = ['Invoice Numbers', 'ABO', 'Shipment Tracking Number']
+STORE_COLUMNS = SPEND_REPORT_COLUMNS + [c for c in KEY_COLUMNS if c not in SPEND_REPORT_COLUMNS]
+# Keys stay text in every part, or "012345" and 12345 would neither match nor dedupe
+STORE_DTYPES = {**SPEND_REPORT_DTYPES, **{c: "str" for c in KEY_COLUMNS}}
+# What a part holds: the priced rows plus the digest of each raw line
+PRICED_COLUMNS = STORE_COLUMNS + ["Zone", "Calculated Price"]
+PART_COLUMNS = PRICED_COLUMNS + ["_digest"]
+
+
+def _line_digest(line):
+    return int.from_bytes(hashlib.blake2b(line.rstrip(b"\r\n"), digest_size=8).digest(), "little")
+
+
+def _store_parts(store_dir):
+    return sorted(glob.glob(os.path.join(store_dir, "part-*.parquet")))
+
+
+def read_store(store_dir=STORE_DIR):
+    """Priced rows of every merged export, latest version of each key."""
+    parts = _store_parts(store_dir)
+    if not parts:
+        return pd.DataFrame(columns=PRICED_COLUMNS)
+    store = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    store = store.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+    return store.drop(columns="_digest").reset_index(drop=True)
+
+
+def merge_spend_report(file_path, store_dir=STORE_DIR, use_distributor=True):
+    """Parse and price only the lines of an export not yet in the store, and append them.
+
+    Lines are identified by a digest of their raw text, so unchanged rows are skipped
+    before parsing; a changed row gets a new digest and supersedes the stored one by key.
+    Returns the part appended, newly priced rows with their _digest (empty if none).
+    """
+    parts = _store_parts(store_dir)
+    seen = np.concatenate(
+        [pd.read_parquet(p, columns=["_digest"])["_digest"].to_numpy(np.uint64) for p in parts]
+    ) if parts else np.empty(0, dtype=np.uint64)
+
+    with open(file_path, "rb") as f:
+        f.readline()
+        header = f.readline()
+        lines = [line for line in f if line.strip(b"; \r\n")]
+    digests = np.fromiter(map(_line_digest, lines), dtype=np.uint64, count=len(lines))
+    # First occurrence of every line not already stored, in file order
+    _, first = np.unique(digests, return_index=True)
+    first = np.sort(first[~np.isin(digests[first], seen)])
+    if not first.size:
+        return pd.DataFrame(columns=PART_COLUMNS)
+    new_lines = [lines[i] for i in first]
+
+    options = {**CSV_OPTIONS, "header": 0, "usecols": STORE_COLUMNS, "dtype": STORE_DTYPES}
+    delta = normalize_spend_report(pd.read_csv(io.BytesIO(header + b"".join(new_lines)), **options), STORE_COLUMNS)
+    delta = delta.join(price_frame(delta, use_distributor=use_distributor))
+
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, f"part-{len(parts):06d}.parquet")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # Zone mixes numbers and labels ("Flat Rate"); Parquet needs a single type
+    delta["Zone"] = delta["Zone"].astype(str)
+    delta["_digest"] = digests[first]
+    delta.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return delta
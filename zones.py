@@ -0,0 +1,638 @@
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# ---------- INTERVAL RULES ----------
+IntervalRules = namedtuple("IntervalRules", ["lows", "highs", "table"])
+
+
+def compile_intervals(zone_ranges):
+    """Sorted boundary arrays for {zone: [(low, high), ...]} with inclusive ranges.
+
+    table holds the zone of each range plus a 0 slot for values in no range.
+    Raises ValueError if a range is empty or two ranges overlap.
+    """
+    ranges = sorted((low, high, zone) for zone, bounds in zone_ranges.items() for low, high in bounds)
+    for low, high, zone in ranges:
+        if low > high:
+            raise ValueError(f"Empty range {low}-{high} for zone {zone}")
+    for (low, high, zone), (next_low, next_high, next_zone) in zip(ranges, ranges[1:]):
+        if next_low <= high:
+            kind = "overlap" if zone == next_zone else "conflict"
+            raise ValueError(
+                f"Ranges {low}-{high} (zone {zone}) and {next_low}-{next_high} (zone {next_zone}) {kind}"
+            )
+    lows, highs, zones = zip(*ranges)
+    return IntervalRules(np.array(lows), np.array(highs), np.array(zones + (0,), dtype=np.int8))
+
+
+def interval_keys(rules, values):
+    """Index of the range holding each value (-1 if none), for a scalar or a whole column."""
+    position = np.searchsorted(rules.lows, values, side="right") - 1
+    inside = (position >= 0) & (values <= rules.highs[np.maximum(position, 0)])
+    return np.where(inside, position, -1)
+
+
+def interval_zone(rules, value):
+    zone = rules.table[interval_keys(rules, value)]
+    return int(zone) if zone else None
+
+
+# Two-digit postcode prefix ranges
+BELGIUM_INTERVALS = compile_intervals({
+    1: [(10, 13), (16, 19), (21, 22), (25, 26), (28, 28), (30, 31)],
+    2: [(14, 15), (20, 20), (23, 24), (29, 29), (32, 39), (42, 46), (50, 53), (60, 62), (70, 72), (90, 99)],
+    3: [(40, 41), (47, 49), (55, 56), (64, 66), (68, 69), (73, 73), (75, 89)],
+    4: [(67, 67)],
+})
+
+ESTONIA_INTERVALS = compile_intervals({
+    1: [(10000, 13999), (15000, 15000), (74000, 76999)],
+    2: [(45000, 45000), (72000, 73999), (78000, 79999)],
+    3: [(29000, 32999), (40000, 44999), (46000, 46000), (48000, 51999), (60000, 61999),
+        (69000, 71999), (80000, 80000), (85000, 88999), (90000, 92999), (94000, 94999)],
+    4: [(20000, 21999), (62000, 68999), (93000, 93999)],
+})
+
+
+def get_zone_france(zipcode):
+    prefix = str(zipcode)[:2]
+    if prefix in ['69']:
+        return 1
+    elif prefix in ['38', '42']:
+        return 2
+    elif prefix in ['01', '03', '04', '05', '07', '13', '21', '25', '26', '30', '34','39', '43', '48', '58', '63', '71', '73', '74', '84']:
+        return 3
+    elif prefix in ['06', '11', '12', '15', '19', '23', '24', '46', '66', '68','70', '81', '83', '90']:
+        return 4
+    elif prefix in ['16', '17', '22', '56', '67', '85', '09', '31', '32', '33','47', '65', '82']:
+        return 5
+    elif prefix in ['75', '91', '92', '94']:
+        return 6
+    elif prefix in ['77', '78', '93', '95']:
+        return 7
+    elif prefix in ['02', '10', '27', '28', '41', '45', '51', '60', '76', '80', '89']:
+        return 8
+    elif prefix in ['40', '64']:
+        return 9
+    elif prefix in ['08', '14', '18', '36', '37', '52', '53', '55', '59', '61', '62', '72']:
+        return 10
+    elif prefix in ['35', '44', '49', '50', '54', '57', '79', '86', '87', '88']:
+        return 11
+    elif prefix in ['29']:
+        return 12
+    else:
+        return None
+
+
+def get_zone_belgium(zipcode):
+    try:
+        prefix = int(str(zipcode)[:2])
+    except:
+        return None
+    return interval_zone(BELGIUM_INTERVALS, prefix)
+
+
+def get_zone_czech(zipcode):
+    try:
+        prefix = int(str(zipcode)[:2])
+    except:
+        return None
+
+    if prefix in {10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 25, 27}:
+        return 1
+    elif prefix in {26, 28, 29, 30, 31, 32, 33, 41, 43, 44, 47}:
+        return 2
+    elif prefix in {60, 61, 62, 63, 64, 66}:
+        return 3
+    elif prefix in {34, 35, 36, 37, 38, 39, 40, 46, 50, 51, 53, 54, 55, 58}:
+        return 4
+    elif prefix in {56, 57, 59, 67, 68, 69, 77}:
+        return 5
+    elif prefix in {70, 71, 72, 73, 74, 75, 76, 78, 79}:
+        return 6
+
+    return None
+
+
+def get_zone_denmark(zipcode):
+    try:
+        prefix = int(str(zipcode).strip()[:2])
+    except:
+        return None
+
+    if prefix in {60, 70, 72, 73, 87}:
+        return 1
+    elif prefix in {
+        51, 52, 54, 55, 56, 61, 65, 66, 67, 68, 69, 71, 74, 80, 81, 82, 83, 86, 88
+    }:
+        return 2
+    elif prefix in {
+        49, 50, 53, 57, 58, 59, 62, 63, 64, 75, 76, 77, 78, 79, 84, 85, 89, 90, 91, 92, 95, 96
+    }:
+        return 3
+    elif prefix in {93, 94, 97, 98, 99}:
+        return 4
+    elif prefix in {
+        10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
+        21, 22, 23, 24, 25, 26, 27, 28, 29, 34, 35, 36, 40, 43
+    }:
+        return 5
+    elif prefix in {30, 31, 32, 33, 41, 42, 44, 45, 46, 47}:
+        return 6
+    elif prefix == 48:
+        return 7
+
+    return None
+
+
+def get_zone_finland(zipcode):
+    try:
+        prefix = int(str(zipcode).strip()[:2])
+    except:
+        return None
+
+    if prefix in {0, 2, 8, 9}:  # "00", "02", "08", "09"
+        return 1
+    elif prefix in {3, 7, 10, 11, 12, 13, 14}:  # "03", "07", "10"–"14"
+        return 2
+    elif prefix in {15, 16, 17, 18, 19, 20, 21, 24, 25, 30, 31, 32, 33, 36, 37, 45, 46, 47, 48, 49}:
+        return 3
+    elif prefix in {23, 26, 27, 28, 29, 34, 35, 38, 39, 40, 41, 42, 50, 51, 52, 53, 54, 55, 56}:
+        return 4
+    elif prefix in {43, 44, 57, 58, 59, 60, 61, 62, 63, 64, 76, 77, 78, 79}:
+        return 5
+    elif prefix in {65, 66, 68, 69, 70, 71, 72, 73, 74, 80, 82, 83}:
+        return 6
+    elif prefix in {22, 67, 75, 81, 84, 85, 86, 87, 88, 89, 90, 91, 92}:
+        return 7
+    elif prefix in {93, 94, 95, 96, 97, 98}:
+        return 8
+    elif prefix == 99:
+        return 9
+
+    return None
+
+
+def get_zone_germany(zipcode):
+    try:
+        prefix = int(str(zipcode).strip()[:2])
+    except:
+        return None
+
+    if prefix in {70, 71, 72, 73, 74, 75, 76, 86, 88, 89, 97}:
+        return 1
+    elif prefix in {44, 45, 51, 55, 56, 57, 58, 60, 61, 65, 78}:
+        return 2
+    elif prefix in {40, 42, 47, 48, 52, 53, 54, 59, 77, 79, 85}:
+        return 3
+    elif prefix in {32, 33, 49, 63, 64, 66, 67, 68, 69}:
+        return 4
+    elif prefix in {34, 41, 46, 50, 80, 81, 82, 84, 87, 90, 91, 92, 93}:
+        return 5
+    elif prefix in {7, 36, 37, 83}:
+        return 6
+    elif prefix in {9, 30, 31, 35, 96}:
+        return 7
+    elif prefix in {26, 27, 28, 99}:
+        return 8
+    elif prefix in {1, 4, 6, 8, 29, 38, 95, 98}:
+        return 9
+    elif prefix in {2, 3, 20, 21, 22, 39, 94}:
+        return 10
+    elif prefix in {10, 12, 13, 14, 15, 23, 25}:
+        return 11
+    elif prefix in {16, 17, 18, 19, 24}:
+        return 12
+
+    return None
+
+
+# UK postcode area (the one or two letters a postcode starts with) -> zone
+UK_POSTCODE_AREAS = {
+    area: zone
+    for zone, areas in enumerate([
+        {'BR', 'CM', 'DA', 'DE', 'E', 'EC', 'IG', 'KT', 'LE', 'ME', 'N', 'NG', 'NW', 'RM', 'S', 'SE', 'SM', 'SS'},
+        {'AL', 'B', 'CO', 'CR', 'CT', 'CV', 'CW', 'DY', 'EN', 'GU', 'HA', 'HP', 'LU', 'NN', 'PE', 'RG', 'RH', 'SG',
+         'SK', 'SL', 'ST', 'SW', 'TF', 'TN', 'TW', 'UB', 'W', 'WC', 'WD', 'WS', 'WV'},
+        {'BA', 'BB', 'BD', 'BL', 'BN', 'BS', 'CB', 'CH', 'DN', 'GL', 'HD', 'HR', 'HU', 'HX', 'IP', 'L', 'LD', 'LN',
+         'LS', 'M', 'MK', 'NR', 'OL', 'OX', 'PO', 'PR', 'SN', 'SO', 'SP', 'SY', 'WA', 'WF', 'WN', 'WR', 'YO'},
+        {'BH', 'CF', 'DH', 'DL', 'DT', 'FY', 'HG', 'NP', 'SR', 'TS'},
+        {'LL', 'NE', 'TA'},
+        {'EX', 'LA', 'SA', 'TQ'},
+        {'BT', 'CA', 'DG', 'EH', 'FK', 'G', 'KA', 'KY', 'ML', 'PL', 'TD', 'TR'},
+        {'AB', 'DD', 'IV', 'PA', 'PH'},
+    ], start=1)
+    for area in areas
+}
+# The area is every leading letter: 'E1 6AN' is E, 'EC1A 1BB' is EC, 'LONDON' is none
+UK_AREA_PATTERN = r"^([A-Z]{1,2})(?![A-Z])"
+
+
+def get_zone_uk(zipcode):
+    match = re.match(UK_AREA_PATTERN, str(zipcode).strip().upper())
+    return UK_POSTCODE_AREAS.get(match.group(1)) if match else None
+
+
+#Poland only has one zone
+
+
+# Ireland is zoned by county. Meath and Wicklow were also listed in zone 2, but zone 1
+# was always checked first, so they stay in zone 1.
+IRELAND_COUNTY_ZONES = {
+    county: zone
+    for zone, counties in enumerate([
+        {'dublin', 'meath', 'wicklow'},
+        {'kildare', 'louth'},
+        {'carlow', 'cavan', 'kilkenny', 'laoighis', 'longford', 'monaghan', 'offaly',
+         'roscommon', 'tipperary', 'westmeath', 'wexford'},
+        {'clare', 'donegal', 'galway', 'leitrim', 'limerick', 'sligo', 'waterford'},
+        {'cork', 'kerry', 'mayo'},
+    ], start=1)
+    for county in counties
+}
+
+# Eircode routing key (first three characters) -> (postal town, county)
+EIRCODE_ROUTING_KEYS = {
+    "A41": ("ballyboughal", "dublin"), "A42": ("garristown", "dublin"), "A45": ("oldtown", "dublin"),
+    "A63": ("greystones", "wicklow"), "A67": ("wicklow", "wicklow"), "A75": ("castleblayney", "monaghan"),
+    "A81": ("carrickmacross", "monaghan"), "A82": ("kells", "meath"), "A83": ("enfield", "meath"),
+    "A84": ("ashbourne", "meath"), "A85": ("dunshaughlin", "meath"), "A86": ("dunboyne", "meath"),
+    "A91": ("dundalk", "louth"), "A92": ("drogheda", "louth"), "A94": ("blackrock", "dublin"),
+    "A96": ("glenageary", "dublin"), "A98": ("bray", "wicklow"), "C15": ("navan", "meath"),
+    "E21": ("cahir", "tipperary"), "E25": ("cashel", "tipperary"), "E32": ("carrick on suir", "tipperary"),
+    "E34": ("tipperary", "tipperary"), "E41": ("thurles", "tipperary"), "E45": ("nenagh", "tipperary"),
+    "E53": ("roscrea", "tipperary"), "E91": ("clonmel", "tipperary"), "F12": ("claremorris", "mayo"),
+    "F23": ("castlebar", "mayo"), "F26": ("ballina", "mayo"), "F28": ("westport", "mayo"),
+    "F31": ("ballinrobe", "mayo"), "F35": ("ballyhaunis", "mayo"), "F42": ("roscommon", "roscommon"),
+    "F45": ("castlerea", "roscommon"), "F52": ("boyle", "roscommon"), "F56": ("ballymote", "sligo"),
+    "F91": ("sligo", "sligo"), "F92": ("letterkenny", "donegal"), "F93": ("lifford", "donegal"),
+    "F94": ("donegal", "donegal"), "H12": ("cavan", "cavan"), "H14": ("belturbet", "cavan"),
+    "H16": ("cootehill", "cavan"), "H18": ("monaghan", "monaghan"), "H23": ("clones", "monaghan"),
+    "H53": ("ballinasloe", "galway"), "H54": ("tuam", "galway"), "H62": ("loughrea", "galway"),
+    "H65": ("athenry", "galway"), "H71": ("clifden", "galway"), "H91": ("galway", "galway"),
+    "K32": ("balbriggan", "dublin"), "K34": ("skerries", "dublin"), "K36": ("malahide", "dublin"),
+    "K45": ("lusk", "dublin"), "K56": ("rush", "dublin"), "K67": ("swords", "dublin"),
+    "K78": ("lucan", "dublin"), "N37": ("athlone", "westmeath"), "N39": ("longford", "longford"),
+    "N41": ("carrick on shannon", "leitrim"), "N91": ("mullingar", "westmeath"),
+    "P12": ("macroom", "cork"), "P14": ("crookstown", "cork"), "P17": ("kinsale", "cork"),
+    "P24": ("cobh", "cork"), "P25": ("midleton", "cork"), "P31": ("ballincollig", "cork"),
+    "P36": ("youghal", "cork"), "P43": ("carrigaline", "cork"), "P47": ("dunmanway", "cork"),
+    "P51": ("mallow", "cork"), "P56": ("charleville", "cork"), "P61": ("fermoy", "cork"),
+    "P67": ("mitchelstown", "cork"), "P72": ("bandon", "cork"), "P75": ("bantry", "cork"),
+    "P81": ("skibbereen", "cork"), "P85": ("clonakilty", "cork"), "R14": ("athy", "kildare"),
+    "R21": ("bagenalstown", "carlow"), "R32": ("portlaoise", "laoighis"), "R35": ("tullamore", "offaly"),
+    "R42": ("birr", "offaly"), "R45": ("edenderry", "offaly"), "R51": ("kildare", "kildare"),
+    "R56": ("curragh", "kildare"), "R93": ("carlow", "carlow"), "R95": ("kilkenny", "kilkenny"),
+    "T12": ("cork", "cork"), "T23": ("cork", "cork"), "T34": ("carrignavar", "cork"),
+    "T45": ("glanmire", "cork"), "T56": ("watergrasshill", "cork"), "V14": ("shannon", "clare"),
+    "V15": ("kilrush", "clare"), "V23": ("caherciveen", "kerry"), "V31": ("listowel", "kerry"),
+    "V35": ("kilmallock", "limerick"), "V42": ("newcastle west", "limerick"), "V92": ("tralee", "kerry"),
+    "V93": ("killarney", "kerry"), "V94": ("limerick", "limerick"), "V95": ("ennis", "clare"),
+    "W12": ("newbridge", "kildare"), "W23": ("celbridge", "kildare"), "W34": ("monasterevin", "kildare"),
+    "W91": ("naas", "kildare"), "X35": ("dungarvan", "waterford"), "X42": ("kilmacthomas", "waterford"),
+    "X91": ("waterford", "waterford"), "Y14": ("arklow", "wicklow"), "Y21": ("enniscorthy", "wexford"),
+    "Y25": ("gorey", "wexford"), "Y34": ("new ross", "wexford"), "Y35": ("wexford", "wexford"),
+    **{f"D{district:02d}": ("dublin", "dublin") for district in range(1, 25)},
+    "D6W": ("dublin", "dublin"),
+}
+
+# Other spellings and places -> county
+IRELAND_ALIASES = {
+    "laois": "laoighis",
+    "dun laoghaire": "dublin", "tallaght": "dublin", "blanchardstown": "dublin", "clondalkin": "dublin",
+    "mhuine bheag": "carlow", "droichead nua": "kildare", "maynooth": "kildare", "leixlip": "kildare",
+    "trim": "meath", "ratoath": "meath", "wicklow town": "wicklow",
+    **{town: county for town, county in EIRCODE_ROUTING_KEYS.values()},
+}
+
+_EIRCODE = re.compile(r"\b([AC-FHKNPRTV-Y]\d[\dW])(?:\s?[AC-FHKNPRTV-Y\d]{4})?\b")
+_IRELAND_PLACE = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, {*IRELAND_COUNTY_ZONES, *IRELAND_ALIASES}), key=len, reverse=True)) + r")\b"
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve_ireland_county(destination):
+    """County of an Irish destination given as a county, a town or an Eircode, or None.
+
+    'Co. Dublin', 'DUBLIN 22', 'DUBL22', 'Athlone' and 'D02 X285' all resolve. In a street
+    address a county name beats a town and the last place named wins: 'Kings Inn St Dublin 1'
+    and 'Cork Street, Dublin 8' are Dublin, 'Main St, Trim' and 'Dublin Road, Trim, Co. Meath'
+    are Meath.
+    """
+    text = str(destination).strip()
+    eircode = _EIRCODE.search(text.upper())
+    if eircode and eircode.group(1) in EIRCODE_ROUTING_KEYS:
+        return EIRCODE_ROUTING_KEYS[eircode.group(1)][1]
+    words = " ".join(re.sub(r"[^a-z]+", " ", text.lower()).split())
+    places = [place.group(1) for place in _IRELAND_PLACE.finditer(words)]
+    counties = [place for place in places if place in IRELAND_COUNTY_ZONES]
+    if counties:
+        return counties[-1]
+    if places:
+        return IRELAND_ALIASES[places[-1]]
+    # A lone abbreviation such as 'DUBL' or 'Kilk.' when it fits a single county; within an
+    # address, words like 'west' or 'long' would match too
+    if len(words.split()) == 1 and len(words) >= 4:
+        counties = [county for county in IRELAND_COUNTY_ZONES if county.startswith(words)]
+        if len(counties) == 1:
+            return counties[0]
+    return None
+
+
+def get_zone_ireland(county):
+    return IRELAND_COUNTY_ZONES.get(resolve_ireland_county(county))
+
+
+def get_zone_netherlands(zipcode):
+    try:
+        prefix = int(str(zipcode)[:2])
+    except:
+        return None
+
+    if (65 <= prefix <= 70) or prefix == 73:
+        return 1
+    elif (
+        prefix in [12, 13, 34, 35, 36, 37, 38, 39, 40, 41, 52, 53, 54, 58, 71, 72, 74, 80, 81, 82]
+    ):
+        return 2
+    elif (
+        prefix in [10, 11, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33,
+                   42, 46, 47, 48, 49, 50, 51, 55, 56, 57, 59, 60, 61, 62, 63, 64, 75, 76, 77, 78, 79,
+                   83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96, 97, 98]
+    ):
+        return 3
+    elif prefix in [43, 44, 45, 99]:
+        return 4
+    else:
+        return None
+
+
+def get_zone_austria(zipcode):
+    try:
+        prefix = int(str(zipcode)[:2])
+    except:
+        return None
+
+    if prefix in [50, 51, 52, 53, 54]:
+        return 1
+    elif prefix in [46, 48, 49, 55, 56, 57, 58]:
+        return 2
+    elif prefix in [10, 11, 12, 13, 21, 22, 23, 34]:
+        return 3
+    elif prefix in [20, 24, 25, 27, 30, 31, 35, 37, 70, 71, 72]:
+        return 4
+    elif prefix in [33, 40, 41, 42, 43, 44, 45, 47, 60, 61, 62, 63, 88, 89, 95, 97, 98]:
+        return 5
+    elif prefix in [80, 84, 85]:
+        return 6
+    elif prefix in [64, 65, 66, 96, 99]:
+        return 7
+    elif prefix in [75, 76, 81, 82, 83]:
+        return 8
+    elif prefix in [67, 68, 69]:
+        return 9
+    elif prefix in [26, 28, 32, 36, 38, 39, 73, 74, 86]:
+        return 10
+    elif prefix in [29, 87, 90, 91, 92, 93, 94]:
+        return 11
+    elif prefix == 14:
+        return 12
+    else:
+        return None
+
+
+def get_zone_switzerland(zipcode):
+    try:
+        prefix = int(str(zipcode)[:2])
+    except:
+        return None
+
+    if prefix in [28, 29, 40, 41, 42, 43, 44, 46, 50, 52]:
+        return 1
+    elif prefix in [51, 53, 54, 55, 56, 80, 81, 82, 83, 84, 86, 89]:
+        return 2
+    elif prefix in [25, 27, 30, 33, 34, 45, 47, 48, 49, 57, 61, 62]:
+        return 3
+    elif prefix in [60, 63, 64, 85, 87, 88, 90, 91, 92, 93, 95, 96]:
+        return 4
+    elif prefix in [10, 13, 14, 15, 16, 17, 18, 20, 21, 22, 23, 24, 26, 31, 32, 35, 36, 37, 38, 73, 94, 97]:
+        return 5
+    elif prefix in [65, 67, 70, 71, 72, 74]:
+        return 6
+    elif prefix in [11, 12, 19, 39, 66, 68, 69, 75, 76]:
+        return 7
+    elif prefix == 77:
+        return 8
+    else:
+        return None
+
+
+def get_zone_estonia(zipcode):
+    try:
+        zip_int = int(zipcode)
+    except:
+        return None
+    return interval_zone(ESTONIA_INTERVALS, zip_int)
+
+
+def get_zone_croatia(zipcode):
+    try:
+        prefix = int(str(zipcode)[:2])
+    except:
+        return None
+
+    if prefix == 10:
+        return 1
+    elif prefix in [42, 44, 47, 49]:
+        return 2
+    elif prefix in [33, 34, 40, 43, 48, 51, 53]:
+        return 3
+    elif prefix in [23, 31, 32, 35, 52]:
+        return 4
+    elif prefix == 22:
+        return 5
+    elif prefix == 21:
+        return 6
+    elif prefix == 20:
+        return 7
+    else:
+        return None
+
+
+# ---------- POSTCODE NORMALIZATION ----------
+# Digits in an all-numeric postcode; shorter values lost their leading zeros
+POSTCODE_LENGTHS = {
+    "AT": 4, "BE": 4, "BG": 4, "CH": 4, "DK": 4, "HU": 4, "NO": 4,
+    "CZ": 5, "DE": 5, "EE": 5, "ES": 5, "FI": 5, "FR": 5, "GR": 5, "HR": 5, "IT": 5, "SE": 5, "SK": 5,
+    "RO": 6,
+}
+UK_POSTCODE_PATTERN = r"[A-Z]{1,2}\d[A-Z\d]?\d[A-Z]{2}"
+
+
+def normalize_postcodes(zipcodes, country_codes):
+    """Canonical postcodes for a whole column: trimmed, upper case, single spaces,
+    numeric codes padded to their country's length and full UK postcodes split
+    into outward and inward code ('SW1A1AA' -> 'SW1A 1AA'). Missing stays missing.
+    """
+    zipcodes = pd.Series(zipcodes)
+    index = zipcodes.index
+    codes = zipcodes.reset_index(drop=True).astype(str).str.strip().str.upper()
+    codes = codes.str.replace(r"\s+", " ", regex=True).str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    missing = zipcodes.isna().to_numpy() | (codes == "").to_numpy()
+    countries = pd.Series(country_codes).reset_index(drop=True)
+
+    lengths = countries.map(POSTCODE_LENGTHS)
+    numeric = codes.str.fullmatch(r"\d+").fillna(False).astype(bool)
+    for length in sorted(set(POSTCODE_LENGTHS.values())):
+        short = (numeric & (lengths == length) & (codes.str.len() < length)).to_numpy()
+        codes[short] = codes[short].str.zfill(length)
+
+    uk = (countries == "GB").to_numpy()
+    compact = codes[uk].str.replace(" ", "", regex=False)
+    full = compact.str.fullmatch(UK_POSTCODE_PATTERN).fillna(False).astype(bool)
+    compact = compact[full]
+    codes[compact.index] = compact.str[:-3] + " " + compact.str[-3:]
+
+    codes[missing] = np.nan
+    return codes.set_axis(index)
+
+
+# ---------- COMPILED ZONE TABLES ----------
+def compile_prefix_table(zone_func):
+    """Zone for every two-digit prefix 00-99 (0 = no zone), plus a 0 slot for bad codes."""
+    return np.array([zone_func(f"{prefix:02d}") or 0 for prefix in range(100)] + [0], dtype=np.int8)
+
+
+def prefix_keys(zipcodes, two_digits=False):
+    # int() accepts "7" as well as "07"; France compares the two-character string
+    prefix = pd.Series(zipcodes, dtype=object).astype(str).str.strip().str[:2]
+    valid = prefix.str.fullmatch(r"\d\d" if two_digits else r"\d\d?")
+    return pd.to_numeric(prefix.where(valid), errors="coerce").fillna(-1).to_numpy(dtype=np.intp)
+
+
+def code_keys(zipcodes, size):
+    code = pd.to_numeric(pd.Series(zipcodes, dtype=object).astype(str).str.strip(), errors="coerce")
+    code = code.where((code >= 0) & (code < size) & (code % 1 == 0))
+    return code.fillna(-1).to_numpy(dtype=np.intp)
+
+
+def compile_area_table(area_zones):
+    """Sorted areas and their zones, plus a 0 slot for postcodes with no known area."""
+    areas = np.array(sorted(area_zones))
+    return areas, np.array([area_zones[area] for area in areas] + [0], dtype=np.int8)
+
+
+def area_keys(zipcodes, areas):
+    # Longest run of leading letters, then its position in the sorted areas (-1 if absent)
+    area = (
+        pd.Series(zipcodes, dtype=object).astype(str).str.strip().str.upper()
+        .str.extract(UK_AREA_PATTERN, expand=False).fillna("").to_numpy(dtype=str)
+    )
+    position = np.minimum(np.searchsorted(areas, area), len(areas) - 1)
+    return np.where(areas[position] == area, position, -1)
+
+
+UK_AREAS, UK_AREA_TABLE = compile_area_table(UK_POSTCODE_AREAS)
+
+# Country code -> (zone table, key function). Index -1 hits the trailing 0 slot.
+ZONE_TABLES = {
+    "FR": (compile_prefix_table(get_zone_france), lambda z: prefix_keys(z, two_digits=True)),
+    "BE": (compile_prefix_table(get_zone_belgium), prefix_keys),
+    "CZ": (compile_prefix_table(get_zone_czech), prefix_keys),
+    "DK": (compile_prefix_table(get_zone_denmark), prefix_keys),
+    "FI": (compile_prefix_table(get_zone_finland), prefix_keys),
+    "DE": (compile_prefix_table(get_zone_germany), prefix_keys),
+    "NL": (compile_prefix_table(get_zone_netherlands), prefix_keys),
+    "AT": (compile_prefix_table(get_zone_austria), prefix_keys),
+    "CH": (compile_prefix_table(get_zone_switzerland), prefix_keys),
+    "HR": (compile_prefix_table(get_zone_croatia), prefix_keys),
+    "GB": (UK_AREA_TABLE, lambda z: area_keys(z, UK_AREAS)),
+    "EE": (ESTONIA_INTERVALS.table, lambda z: interval_keys(ESTONIA_INTERVALS, code_keys(z, 100000))),
+}
+
+
+def zone_column(country_code, zipcodes):
+    """Zones for a column of ZIP codes of one country (0 = no zone), or None if not compiled."""
+    if country_code not in ZONE_TABLES:
+        return None
+    table, keys = ZONE_TABLES[country_code]
+    # Parse each distinct code once, then a single gather per row
+    inverse, uniques = pd.factorize(np.asarray(zipcodes, dtype=object), use_na_sentinel=False)
+    return np.take(np.take(table, keys(uniques)), inverse)
+
+
+# ---------- ZONE MEMO ----------
+def rules_fingerprint():
+    """Digest of this module's source, which holds every zone rule and every lookup that reads one."""
+    with open(__file__, "rb") as source:
+        return hashlib.blake2b(source.read(), digest_size=8).hexdigest()
+
+
+# Changes whenever a zone rule does; memoized zones from other versions must not be reused
+ZONE_RULES_VERSION = rules_fingerprint()
+
+
+def memo_key(zipcode):
+    return None if pd.isna(zipcode) else str(zipcode).strip().upper()
+
+
+class ZoneMemo:
+    """Bounded LRU of (country code, normalized postcode) -> zone, safe to share between threads.
+
+    hits and misses count distinct postcodes looked up, not rows.
+    """
+
+    def __init__(self, maxsize=100_000, version=ZONE_RULES_VERSION):
+        self.maxsize = maxsize
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._zones = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._zones)
+
+    def clear(self):
+        with self._lock:
+            self._zones.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._zones),
+                    "maxsize": self.maxsize, "version": self.version}
+
+    def zones(self, country_code, zipcodes, compute):
+        """Float zones for a ZIP column; compute(postcodes) runs only for postcodes not memoized."""
+        inverse, uniques = pd.factorize(np.asarray(zipcodes, dtype=object), use_na_sentinel=False)
+        postcodes = np.array([memo_key(zipcode) for zipcode in uniques], dtype=object)
+        zones = np.full(len(postcodes), np.nan)
+        missing = []
+        with self._lock:
+            for i, postcode in enumerate(postcodes):
+                key = (country_code, postcode)
+                if key in self._zones:
+                    self._zones.move_to_end(key)
+                    zones[i] = self._zones[key]
+                else:
+                    missing.append(i)
+            self.hits += len(postcodes) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            # Computed outside the lock; another thread may store the same keys meanwhile
+            zones[missing] = compute(postcodes[missing])
+            with self._lock:
+                for i in missing:
+                    self._zones[(country_code, postcodes[i])] = zones[i]
+                while len(self._zones) > self.maxsize:
+                    self._zones.popitem(last=False)
+        return zones[inverse]